@@ -14,6 +14,17 @@ import os
 import errno
 import shlex
 import re
+import textwrap
+from typing import NamedTuple, Optional
+import hashlib
+import importlib.metadata
+import pickle
+import io
+import contextlib
+import functools
+import ctypes
+import multiprocessing
+import tempfile
 
 try:
     import clang.cindex
@@ -21,6 +32,154 @@ except ModuleNotFoundError:
     clang = None
 
 
+# Line starting a class/struct declaration (optionally after a one-line template header)
+_RE_CLASS_DECL_LINE = re.compile(r'^\s*(?:template\s*<.*>\s*)?(?:class|struct)\s+\w+')
+_RE_FORWARD_DECL_LINE = re.compile(r'^\s*(?:template\s*<.*>\s*)?(?:class|struct)\s+\w+\s*;')
+
+# Class heads up to the opening brace ("class X ... {"), used by the text inheritance fallback
+_RE_CLASS_HEAD = re.compile(r'\bclass\s+(\w+)\b([^{;]*)\{')
+# Start of a template parameter list, whose "class T" parameters are not class heads
+_RE_TEMPLATE_LIST_START = re.compile(r'\btemplate\s*<')
+_BASE_SPECIFIER_KEYWORDS = frozenset(('public', 'protected', 'private', 'virtual'))
+# Any class or struct head with a base clause (a single ':' before the body or ';')
+_RE_DERIVED_CLASS_HEAD = re.compile(r'\b(?:class|struct)\s+\w+[^;{]*?(?<!:):(?!:)')
+
+# Type string cleanup
+_RE_CV_QUALIFIER = re.compile(r'\s*(const|volatile)\s+')
+_RE_PTR_REF_SUFFIX = re.compile(r'[*&]+\s*$')
+_RE_NAME_BEFORE_TEMPLATE_ARGS = re.compile(r'([^<]+)')
+_RE_STAR_SPACING = re.compile(r'\s*\*\s*')
+_RE_WHITESPACE = re.compile(r'\s+')
+# Token spacing rules for types rebuilt from parameter tokens, applied in order
+_TYPE_TOKEN_SPACING = (
+    (re.compile(r'\s*::\s*'), '::'),
+    (re.compile(r'\s*<\s*'), '<'),
+    (re.compile(r'\s*>\s*'), '>'),
+    (re.compile(r'\s*,\s*'), ', '),
+    (re.compile(r'\s*&\s*'), '&'),
+    (_RE_STAR_SPACING, '*'),
+)
+
+# Source scanning for access specifiers, default values and pure virtual members
+_RE_ACCESS_LABEL = re.compile(r'\s*(public|private|protected)\s*:\s*$')
+_RE_LEADING_EQUALS = re.compile(r'^(?:=\s*)+')
+_RE_PURE_VIRTUAL = re.compile(
+    r"\bvirtual\b[\s\S]*?\)\s*"
+    r"(?:const\s*)?"
+    r"(?:noexcept(?:\s*\([^)]*\))?\s*)?"
+    r"(?:override\s*)?"
+    r"(?:final\s*)?"
+    r"=\s*0\s*;",
+    re.MULTILINE,
+)
+
+
+# Patterns that embed a class name, compiled once per name
+@functools.lru_cache(maxsize=None)
+def _class_keyword_pattern(class_name):
+    """Match "class <class_name>" or "struct <class_name>"."""
+    return re.compile(rf"\b(class|struct)\s+{re.escape(class_name)}\b")
+
+
+@functools.lru_cache(maxsize=None)
+def _struct_keyword_pattern(class_name):
+    """Match "struct <class_name>", which makes members public by default."""
+    return re.compile(rf"\bstruct\s+{re.escape(class_name)}\b")
+
+
+@functools.lru_cache(maxsize=None)
+def _class_body_start_pattern(class_name):
+    """Match a class or struct head up to and including the opening brace of its body."""
+    return re.compile(rf"\b(class|struct)\s+{re.escape(class_name)}\b.*?\{{",
+                      re.MULTILINE | re.DOTALL)
+
+
+class ConstructorParam(NamedTuple):
+    """One parameter of a public constructor."""
+    type: str
+    name: str
+    default: Optional[str]
+
+
+class SubclassEntry(NamedTuple):
+    """A registrable subclass found under one base class."""
+    name: str
+    header: str
+    template_params: tuple
+    constructors: list  # each a list of ConstructorParam
+    metadata: dict
+
+    @classmethod
+    def from_result(cls, entry):
+        """Rebuild an entry from the plain tuples stored in a process_header result."""
+        name, header, template_params, constructors, metadata = entry
+        constructors = [[ConstructorParam(*param) for param in ctor] for ctor in constructors]
+        return cls(name, header, tuple(template_params), constructors, metadata)
+
+
+class ClassChildren(NamedTuple):
+    """The direct children of a class cursor that the AST passes use, grouped by role."""
+    template_params: list  # template type and non-type parameter cursors, in order
+    constructors: list
+    base_specifiers: list
+
+
+# Cursor kinds used by the AST passes, resolved once instead of per cursor
+if clang is not None:
+    _CursorKind = clang.cindex.CursorKind
+    # Kinds hash by identity, so frozenset membership beats scanning a tuple
+    _CLASS_KINDS = frozenset((_CursorKind.CLASS_DECL, _CursorKind.STRUCT_DECL, _CursorKind.CLASS_TEMPLATE))
+    _CONTAINER_KINDS = frozenset((_CursorKind.NAMESPACE, _CursorKind.LINKAGE_SPEC, _CursorKind.UNEXPOSED_DECL))
+    _WALKED_KINDS = _CLASS_KINDS | _CONTAINER_KINDS
+    _CK_CLASS_TEMPLATE = _CursorKind.CLASS_TEMPLATE
+    _CK_TEMPLATE_TYPE_PARAMETER = _CursorKind.TEMPLATE_TYPE_PARAMETER
+    _CK_TEMPLATE_NON_TYPE_PARAMETER = _CursorKind.TEMPLATE_NON_TYPE_PARAMETER
+    _CK_CONSTRUCTOR = _CursorKind.CONSTRUCTOR
+    _CK_PARM_DECL = _CursorKind.PARM_DECL
+    _CK_CXX_BASE_SPECIFIER = _CursorKind.CXX_BASE_SPECIFIER
+    _ACCESS_PUBLIC = clang.cindex.AccessSpecifier.PUBLIC
+    # Expression kinds a parameter's default argument can appear as
+    _DEFAULT_EXPR_KINDS = frozenset((
+        _CursorKind.INTEGER_LITERAL,
+        _CursorKind.FLOATING_LITERAL,
+        _CursorKind.STRING_LITERAL,
+        _CursorKind.CXX_BOOL_LITERAL_EXPR,
+        _CursorKind.CXX_NULL_PTR_LITERAL_EXPR,
+        _CursorKind.UNEXPOSED_EXPR,
+        _CursorKind.CALL_EXPR,
+        _CursorKind.UNARY_OPERATOR,
+    ))
+    # ClassChildren field index for each child kind collected from a class cursor
+    _CLASS_CHILD_SLOTS = {
+        _CK_TEMPLATE_TYPE_PARAMETER: 0,
+        _CK_TEMPLATE_NON_TYPE_PARAMETER: 0,
+        _CK_CONSTRUCTOR: 1,
+        _CK_CXX_BASE_SPECIFIER: 2,
+    }
+
+
+# =============================================================================
+# Diagnostics
+# =============================================================================
+
+# Set REGISTRY_GEN_VERBOSE=1 or pass --verbose to print per-header and per-class diagnostics
+VERBOSE = os.environ.get('REGISTRY_GEN_VERBOSE', '0') not in ('', '0')
+
+
+def log(*args):
+    """Print a diagnostic message if VERBOSE is enabled."""
+    if VERBOSE:
+        print(*args)
+
+
+def set_verbose(enabled):
+    """Enable or disable diagnostics, including in parser processes started later."""
+    global VERBOSE
+    VERBOSE = enabled
+    # Spawned workers re-import the module and only see the environment
+    os.environ['REGISTRY_GEN_VERBOSE'] = '1' if enabled else '0'
+
+
 # =============================================================================
 # Libclang Initialization
 # =============================================================================
@@ -71,73 +230,362 @@ def get_parse_args():
         except Exception:
             pass
     
-    args = ['-std=c++17', '-I.', '-Iinclude', '-xc++']
+    # No warnings and no typo correction: only the declarations are read, never the diagnostics
+    args = ['-std=c++17', '-I.', '-Iinclude', '-xc++', '-w', '-fno-spell-checking']
     for sys_include in ['/usr/include/c++/11', '/usr/include/c++/13', '/usr/include']:
         if os.path.exists(sys_include):
             args.append(f'-I{sys_include}')
     return args
 
 
+def get_parse_options():
+    """Get libclang parse options. Only declarations are inspected, so function bodies are skipped."""
+    return (clang.cindex.TranslationUnit.PARSE_SKIP_FUNCTION_BODIES | # type: ignore
+            clang.cindex.TranslationUnit.PARSE_INCOMPLETE) # type: ignore
+
+
+# =============================================================================
+# Header Source Access
+# =============================================================================
+
+# Header contents keyed by path, shared by all source-text passes of one run
+_HEADER_LINES_CACHE = {}
+_HEADER_TEXT_CACHE = {}
+_HEADER_BYTES_CACHE = {}
+_METADATA_INDEX_CACHE = {}
+_INHERITANCE_INDEX_CACHE = {}
+_METADATA_TAGS_CACHE = {}
+
+
+def read_header_lines(header_path):
+    """Return the lines of a header, reading the file only on first use."""
+    lines = _HEADER_LINES_CACHE.get(header_path)
+    if lines is None:
+        with open(header_path, 'r') as f:
+            lines = f.readlines()
+        _HEADER_LINES_CACHE[header_path] = lines
+    return lines
+
+
+def read_header_text(header_path):
+    """Return the full text of a header, built from the cached lines."""
+    text = _HEADER_TEXT_CACHE.get(header_path)
+    if text is None:
+        text = ''.join(read_header_lines(header_path))
+        _HEADER_TEXT_CACHE[header_path] = text
+    return text
+
+
+def read_header_bytes(header_path):
+    """Return the raw bytes of a header, which libclang source offsets index into."""
+    data = _HEADER_BYTES_CACHE.get(header_path)
+    if data is None:
+        with open(header_path, 'rb') as f:
+            data = f.read()
+        _HEADER_BYTES_CACHE[header_path] = data
+    return data
+
+
+def clear_header_caches():
+    """Drop cached header contents and everything derived from them."""
+    _HEADER_LINES_CACHE.clear()
+    _HEADER_TEXT_CACHE.clear()
+    _HEADER_BYTES_CACHE.clear()
+    _METADATA_INDEX_CACHE.clear()
+    _INHERITANCE_INDEX_CACHE.clear()
+    _METADATA_TAGS_CACHE.clear()
+
+
+# =============================================================================
+# Precompiled Preamble
+# =============================================================================
+
+def find_base_class_headers(headers, base_classes):
+    """Cheap text scan for the headers that define the base classes."""
+    found = []
+    for base_class in base_classes:
+        pattern = re.compile(rf"\b(class|struct)\s+{re.escape(base_class)}\b[^;]*?\{{", re.DOTALL)
+        for h in headers:
+            try:
+                txt = read_header_text(h)
+            except Exception:
+                continue
+            if pattern.search(txt):
+                if h not in found:
+                    found.append(h)
+                break
+    return found
+
+
+def build_preamble_pch(index, base_headers, parse_args, pch_dir):
+    """
+    Precompile the base-class headers (and everything they include) once so
+    subclass headers can be parsed with -include-pch instead of re-parsing them.
+    The preamble and PCH are named by a digest of their inputs and moved into place
+    atomically, so concurrent runs never read a file another run is still writing.
+    Returns: (pch_path, dependencies), or (None, []) if no PCH could be built.
+    """
+    if not base_headers or not pch_dir:
+        return None, []
+
+    preamble = ''.join(f'#include "{os.path.abspath(h)}"\n' for h in base_headers)
+    key = hashlib.sha256('\0'.join((preamble, repr(list(parse_args)), _libclang_version()))
+                         .encode('utf-8')).hexdigest()[:16]
+    # Not a .hpp, so header globs over a source tree never pick the preamble up
+    preamble_path = os.path.join(pch_dir, f'_registry_preamble_{key}.h')
+    pch_path = os.path.join(pch_dir, f'_registry_preamble_{key}.pch')
+    tmp_suffix = f'.{os.getpid()}.tmp'
+
+    try:
+        os.makedirs(pch_dir, exist_ok=True)
+        # The PCH records the preamble as an input file, so an existing one is never rewritten
+        if not os.path.exists(preamble_path):
+            with open(preamble_path + tmp_suffix, 'w') as f:
+                f.write(preamble)
+            os.replace(preamble_path + tmp_suffix, preamble_path)
+
+        log("Precompiling preamble:", base_headers)
+        tu = index.parse(preamble_path, args=parse_args + ['-xc++-header'], options=get_parse_options())
+        tu.save(pch_path + tmp_suffix)
+        os.replace(pch_path + tmp_suffix, pch_path)
+    except Exception as e:
+        for path in (preamble_path + tmp_suffix, pch_path + tmp_suffix):
+            with contextlib.suppress(OSError):
+                os.unlink(path)
+        print(f"Warning: could not build preamble PCH, parsing headers without it: {e}")
+        return None, []
+
+    dependencies = sorted({str(inc.include.name) for inc in tu.get_includes() if inc.include})
+    return pch_path, dependencies
+
+
 # =============================================================================
 # AST Inspection Utilities
 # =============================================================================
 
-def get_template_parameters(node):
+# Canonical (real, absolute) form of each file path compared during a run
+_CANONICAL_PATH_CACHE = {}
+
+
+def _canonical_path(path):
+    """Return os.path.realpath(path), computed once per distinct path."""
+    canonical = _CANONICAL_PATH_CACHE.get(path)
+    if canonical is None:
+        canonical = _CANONICAL_PATH_CACHE[path] = os.path.realpath(path)
+    return canonical
+
+
+def is_in_current_file(node_file, current_file):
+    """Check if a cursor's file path refers to the header currently being parsed."""
+    if not node_file:
+        return False
+    if node_file == current_file:
+        return True
+    return _canonical_path(node_file) == _canonical_path(current_file)
+
+
+# clang_visitChildren visitor results (CXChildVisitResult)
+_CHILD_VISIT_BREAK = 0
+_CHILD_VISIT_CONTINUE = 1
+_CHILD_VISIT_RECURSE = 2
+
+
+def _location_is_from_main_file():
+    """Return libclang's clang_Location_isFromMainFile, which the bindings do not register."""
+    fn = clang.cindex.conf.lib.clang_Location_isFromMainFile # type: ignore
+    if fn.restype is not ctypes.c_int:
+        fn.argtypes = [clang.cindex.SourceLocation] # type: ignore
+        fn.restype = ctypes.c_int
+    return fn
+
+
+def iter_class_declarations(cursor, current_file):
+    """
+    Yield (cursor, file path) for class, struct and class template declarations located
+    in current_file, in preorder. current_file must be the main file of the cursor's
+    translation unit.
+    The whole walk is a single clang_visitChildren call. It only recurses into namespaces,
+    linkage specs and class bodies, and skips subtrees from other files (included headers,
+    the preamble PCH) by file id, without creating Python cursors for their contents or
+    comparing path strings.
+    """
+    class_kinds = _CLASS_KINDS
+    walked_kinds = _WALKED_KINDS
+    from_main_file = _location_is_from_main_file()
+    found = []
+    errors = []
+
+    def visitor(node, parent, _):
+        try:
+            kind = node.kind
+            if kind not in walked_kinds:
+                return _CHILD_VISIT_CONTINUE
+
+            location = node.location
+            if not from_main_file(location):
+                return _CHILD_VISIT_CONTINUE
+
+            if kind in class_kinds:
+                # Keep the translation unit alive for as long as the cursor is used
+                node._tu = cursor._tu
+                found.append((node, str(location.file) if location.file else current_file))
+            return _CHILD_VISIT_RECURSE
+        except Exception as e:
+            # Exceptions cannot propagate through the C callback, re-raise them below
+            errors.append(e)
+            return _CHILD_VISIT_BREAK
+
+    clang.cindex.conf.lib.clang_visitChildren( # type: ignore
+        cursor, clang.cindex.callbacks['cursor_visit'](visitor), None) # type: ignore
+    if errors:
+        raise errors[0]
+    return iter(found)
+
+
+def collect_class_children(node):
+    """
+    Sort the direct children of a class cursor into a ClassChildren in a single
+    get_children pass, so the template, constructor and inheritance passes do not
+    each iterate the class again.
+    """
+    children = ClassChildren([], [], [])
+    slots = _CLASS_CHILD_SLOTS
+    for child in node.get_children():
+        slot = slots.get(child.kind)
+        if slot is not None:
+            children[slot].append(child)
+    return children
+
+
+def get_template_parameters(node, children=None):
     """Extract template parameter names from a class template node."""
     template_params = []
-    if node.kind != clang.cindex.CursorKind.CLASS_TEMPLATE: # type: ignore
+    if node.kind != _CK_CLASS_TEMPLATE:
         return template_params
+    if children is None:
+        children = collect_class_children(node)
     
-    for child in node.get_children():
-        if child.kind == clang.cindex.CursorKind.TEMPLATE_TYPE_PARAMETER: # type: ignore
+    for child in children.template_params:
+        if child.kind == _CK_TEMPLATE_TYPE_PARAMETER:
             param_name = child.spelling or f"T{len(template_params)}"
-            template_params.append(param_name)
-        elif child.kind == clang.cindex.CursorKind.TEMPLATE_NON_TYPE_PARAMETER: # type: ignore
+        else:
             param_name = child.spelling or f"N{len(template_params)}"
-            template_params.append(param_name)
+        template_params.append(param_name)
     return template_params
 
 
+METADATA_SCAN_LINES = 15
+
+
+def _parse_metadata_line(line, metadata):
+    """Apply a metadata comment line ("// @tag: value") to metadata.
+    Returns True if the line was a tag. Most lines are rejected by the prefix checks
+    before any further parsing.
+    """
+    if not line.startswith('//'):
+        return False
+    rest = line[2:].lstrip()
+    if not rest.startswith('@'):
+        return False
+    tag, sep, value = rest[1:].partition(':')
+    # A tag needs a value on the same line
+    if not sep or value in ('', '\n'):
+        return False
+
+    if tag == 'registry_name':
+        metadata['registry_name'] = value.strip()
+    elif tag == 'registry_aliases':
+        metadata['aliases'] = [a.strip() for a in value.split(',')]
+    elif tag == 'category':
+        metadata['category'] = value.strip()
+    else:
+        return False
+    return True
+
+
+# Tag names recognized by _parse_metadata_line, each written as "@<tag>:"
+_METADATA_TAGS = ('registry_name', 'registry_aliases', 'category')
+
+
+def header_has_metadata_tags(header_path):
+    """Cheap substring check for whether a header contains any metadata tag at all."""
+    present = _METADATA_TAGS_CACHE.get(header_path)
+    if present is None:
+        text = read_header_text(header_path)
+        present = '@' in text and any(f'@{tag}:' in text for tag in _METADATA_TAGS)
+        _METADATA_TAGS_CACHE[header_path] = present
+    return present
+
+
+def build_metadata_index(header_path):
+    """
+    Map the line number of every class/struct declaration in a header to the metadata
+    tags directly above it, in a single pass. Tags only apply to the next declaration
+    and only within METADATA_SCAN_LINES lines of it. Results are cached per header.
+    """
+    index = _METADATA_INDEX_CACHE.get(header_path)
+    if index is not None:
+        return index
+
+    index = {}
+    pending = []  # (line_idx, tag_line) not yet attached to a declaration
+    for i, line in enumerate(read_header_lines(header_path)):
+        if _parse_metadata_line(line, {}):
+            pending.append((i, line))
+        elif _RE_CLASS_DECL_LINE.match(line) and not _RE_FORWARD_DECL_LINE.match(line):
+            metadata = {}
+            for tag_idx, tag_line in pending:
+                if tag_idx >= i - METADATA_SCAN_LINES:
+                    _parse_metadata_line(tag_line, metadata)
+            index[i + 1] = metadata
+            pending = []
+
+    _METADATA_INDEX_CACHE[header_path] = index
+    return index
+
+
 def get_class_metadata(node, header_path):
     """Extract @registry_name, @registry_aliases, and @category from comments above class."""
     if not node.location or not node.location.line:
         return {}
     
     try:
-        with open(header_path, 'r') as f:
-            lines = f.readlines()
-        
-        class_line = node.location.line - 1  # 0-indexed
+        if not header_has_metadata_tags(header_path):
+            return {}
+        class_line = node.location.line
+        index = build_metadata_index(header_path)
+        if class_line in index:
+            return dict(index[class_line])
+
+        # Declaration line not recognized by the index, scan the lines above it directly
+        lines = read_header_lines(header_path)
         metadata = {}
-        
-        for i in range(max(0, class_line - 15), class_line):
-            line = lines[i]
-            if match := re.match(r'//\s*@registry_name:\s*(.+)', line):
-                metadata['registry_name'] = match.group(1).strip()
-            elif match := re.match(r'//\s*@registry_aliases:\s*(.+)', line):
-                metadata['aliases'] = [a.strip() for a in match.group(1).split(',')]
-            elif match := re.match(r'//\s*@category:\s*(.+)', line):
-                metadata['category'] = match.group(1).strip()
-        
+        for i in range(max(0, class_line - 1 - METADATA_SCAN_LINES), class_line - 1):
+            _parse_metadata_line(lines[i], metadata)
         return metadata
     except Exception:
         return {}
 
 
-def get_class_constructors(node, class_name):
+def get_class_constructors(node, class_name, header_path=None, children=None):
     """
     Extract constructor information from a class node.
-    Returns: list of constructors, each as [(param_type, param_name, default_value), ...]
+    header_path and children may be passed when the caller already resolved the
+    cursor's file or collected its children.
+    Returns: list of constructors, each a list of ConstructorParam
     """
     constructors = []
     any_constructor_seen = False
-    header_path = str(node.location.file) if node.location and node.location.file else None
+    if header_path is None:
+        header_path = str(node.location.file) if node.location and node.location.file else None
+    if children is None:
+        children = collect_class_children(node)
     
-    for child in node.get_children():
-        if child.kind != clang.cindex.CursorKind.CONSTRUCTOR: # type: ignore
-            continue
-
+    for child in children.constructors:
+        # A deleted constructor still suppresses the implicit default constructor
         any_constructor_seen = True
+        if child.is_deleted_method():
+            continue
 
         source_access = None
         if header_path and child.location and child.location.line:
@@ -147,19 +595,21 @@ def get_class_constructors(node, class_name):
             if source_access != "public":
                 continue
         else:
-            access = getattr(child, 'access_specifier', None)
-            if access != clang.cindex.AccessSpecifier.PUBLIC: # type: ignore
+            if child.access_specifier != _ACCESS_PUBLIC:
                 continue
         
         params = []
         for param in child.get_children():
-            if param.kind != clang.cindex.CursorKind.PARM_DECL: # type: ignore
+            if param.kind != _CK_PARM_DECL:
                 continue
             
             param_name = param.spelling or "unnamed"
-            param_type = _extract_param_type(param, param_name)
-            default_value = _extract_default_value(param)
-            params.append((param_type, param_name, default_value))
+            # Both the type and the default fallback read the parameter's tokens
+            param_tokens = _token_spellings(param)
+            param_type = _extract_param_type(param, param_name, param_tokens)
+            default_value = _extract_default_value(param, param_tokens)
+            # Type and parameter names repeat across constructors and classes
+            params.append(ConstructorParam(sys.intern(param_type), sys.intern(param_name), default_value))
         
         constructors.append(params)
     
@@ -175,8 +625,7 @@ def _get_member_access_from_source(class_node, header_path, member_line):
     Returns 'public'/'private'/'protected' or None if it cannot be determined.
     """
     try:
-        with open(header_path, 'r') as f:
-            lines = f.readlines()
+        lines = read_header_lines(header_path)
     except Exception:
         return None
 
@@ -186,10 +635,10 @@ def _get_member_access_from_source(class_node, header_path, member_line):
     start_idx = max(0, class_node.location.line - 1)
     class_name = class_node.spelling
 
-    class_decl_pattern = rf"\b(class|struct)\s+{re.escape(class_name)}\b"
+    class_decl_pattern = _class_keyword_pattern(class_name)
     decl_idx = None
     for i in range(start_idx, min(len(lines), start_idx + 60)):
-        if re.search(class_decl_pattern, lines[i]):
+        if class_decl_pattern.search(lines[i]):
             decl_idx = i
             break
     if decl_idx is None:
@@ -206,7 +655,7 @@ def _get_member_access_from_source(class_node, header_path, member_line):
         return None
 
     decl_text = ''.join(lines[decl_idx:open_idx + 1])
-    default_access = 'public' if re.search(rf"\bstruct\s+{re.escape(class_name)}\b", decl_text) else 'private'
+    default_access = 'public' if _struct_keyword_pattern(class_name).search(decl_text) else 'private'
 
     depth = 0
     access = default_access
@@ -215,7 +664,7 @@ def _get_member_access_from_source(class_node, header_path, member_line):
         line = lines[line_idx]
 
         if depth == 1:
-            m = re.match(r'\s*(public|private|protected)\s*:\s*$', line)
+            m = _RE_ACCESS_LABEL.match(line)
             if m:
                 access = m.group(1)
 
@@ -233,17 +682,29 @@ def _get_member_access_from_source(class_node, header_path, member_line):
     return None
 
 
-def _extract_param_type(param_node, param_name):
-    """Recover the declared parameter type, preferring source tokens over clang spelling."""
+def _token_spellings(node):
+    """Return the spellings of a cursor's tokens, or None if libclang cannot tokenize it."""
+    try:
+        return [t.spelling for t in node.get_tokens()]
+    except Exception:
+        return None
+
+
+def _extract_param_type(param_node, param_name, param_tokens=None):
+    """Recover the declared parameter type, preferring source tokens over clang spelling.
+    param_tokens may be passed when the caller already tokenized the parameter.
+    """
     try:
-        param_tokens = [t.spelling for t in param_node.get_tokens()]
+        if param_tokens is None:
+            param_tokens = _token_spellings(param_node)
         reconstructed = _extract_param_type_from_tokens(param_tokens, param_name)
         if reconstructed:
             return reconstructed
     except Exception:
         pass
 
-    return param_node.type.spelling if param_node.type else "unknown"
+    param_type = param_node.type
+    return param_type.spelling if param_type else "unknown"
 
 
 def _extract_param_type_from_tokens(param_tokens, param_name):
@@ -265,37 +726,46 @@ def _extract_param_type_from_tokens(param_tokens, param_name):
     if not value:
         return None
 
-    value = re.sub(r'\s*::\s*', '::', value)
-    value = re.sub(r'\s*<\s*', '<', value)
-    value = re.sub(r'\s*>\s*', '>', value)
-    value = re.sub(r'\s*,\s*', ', ', value)
-    value = re.sub(r'\s*&\s*', '&', value)
-    value = re.sub(r'\s*\*\s*', '*', value)
-    value = re.sub(r'\s+', ' ', value).strip()
+    for pattern, replacement in _TYPE_TOKEN_SPACING:
+        value = pattern.sub(replacement, value)
+    value = _RE_WHITESPACE.sub(' ', value).strip()
     return value or None
 
 
-def _extract_default_value(param_node):
-    """Extract default value from a parameter declaration node."""
-    default_expr_kinds = (
-        clang.cindex.CursorKind.INTEGER_LITERAL, # type: ignore
-        clang.cindex.CursorKind.FLOATING_LITERAL, # type: ignore
-        clang.cindex.CursorKind.STRING_LITERAL, # type: ignore
-        clang.cindex.CursorKind.CXX_BOOL_LITERAL_EXPR, # type: ignore
-        clang.cindex.CursorKind.CXX_NULL_PTR_LITERAL_EXPR, # type: ignore
-        clang.cindex.CursorKind.UNEXPOSED_EXPR, # type: ignore
-        clang.cindex.CursorKind.CALL_EXPR, # type: ignore
-        clang.cindex.CursorKind.UNARY_OPERATOR, # type: ignore
-    )
-    
+def _cursor_source_text(node):
+    """
+    Return the source text of a single-line cursor by slicing the cached header at its
+    extent, or None if the extent is unusable and the caller should join tokens instead.
+    """
+    extent = node.extent
+    start, end = extent.start, extent.end
+    if not start.file or not end.file or start.line != end.line:
+        return None
+    path = start.file.name
+    if path != end.file.name:
+        return None
+    try:
+        data = read_header_bytes(path)
+    except OSError:
+        return None
+    if not 0 <= start.offset < end.offset <= len(data):
+        return None
+    return data[start.offset:end.offset].decode('utf-8', errors='replace')
+
+
+def _extract_default_value(param_node, param_tokens=None):
+    """Extract default value from a parameter declaration node.
+    param_tokens may be passed when the caller already tokenized the parameter.
+    """
     for child in param_node.get_children():
-        if child.kind in default_expr_kinds:
+        if child.kind in _DEFAULT_EXPR_KINDS:
             try:
-                tokens = list(child.get_tokens())
-                if tokens:
-                    value = _normalize_default_value_text(' '.join(t.spelling for t in tokens))
-                    if value and value != "=":
-                        return value
+                text = _cursor_source_text(child)
+                if text is None:
+                    text = ' '.join(t.spelling for t in child.get_tokens())
+                value = _normalize_default_value_text(text)
+                if value and value != "=":
+                    return value
             except Exception:
                 pass
             break
@@ -303,7 +773,8 @@ def _extract_default_value(param_node):
     # Fallback for complex/unexposed defaults: parse from full parameter tokens.
     # This handles cases where libclang exposes only "=" as an unexposed expression.
     try:
-        param_tokens = [t.spelling for t in param_node.get_tokens()]
+        if param_tokens is None:
+            param_tokens = _token_spellings(param_node)
         value = _normalize_default_value_text(_extract_default_from_param_tokens(param_tokens))
         if value:
             return value
@@ -319,7 +790,7 @@ def _normalize_default_value_text(value):
         return None
 
     value = value.strip()
-    value = re.sub(r'^(?:=\s*)+', '', value)
+    value = _RE_LEADING_EQUALS.sub('', value)
     return value or None
 
 
@@ -369,16 +840,18 @@ def _extract_default_from_param_tokens(param_tokens):
 
 
 def _print_constructors(class_name, constructors):
-    """Print constructor information for debugging."""
+    """Print constructor information for debugging, if VERBOSE is enabled."""
+    if not VERBOSE:
+        return
     if constructors and constructors != [[]]:
         print(f"    Found {len(constructors)} constructor(s) for {class_name}:")
         for i, params in enumerate(constructors):
             param_strs = []
-            for ptype, pname, pdefault in params:
-                if pdefault:
-                    param_strs.append(f"{ptype} {pname} = {pdefault}")
+            for param in params:
+                if param.default:
+                    param_strs.append(f"{param.type} {param.name} = {param.default}")
                 else:
-                    param_strs.append(f"{ptype} {pname}")
+                    param_strs.append(f"{param.type} {param.name}")
             print(f"      Constructor {i+1}: {class_name}({', '.join(param_strs)})")
     else:
         print(f"    No explicit constructors found for {class_name} (default constructor available)")
@@ -388,60 +861,188 @@ def _print_constructors(class_name, constructors):
 # Inheritance Detection
 # =============================================================================
 
-def is_subclass_of(node, base_name, seen=None):
-    """Check if node inherits from base_name using AST, following intermediate bases."""
+def _strip_template_args(name):
+    """Drop a trailing template argument list, e.g. "Base<In, Out>" -> "Base".
+    Names that do not end in '>' (such as "Outer<T>::Inner") are returned unchanged.
+    """
+    if name.endswith('>'):
+        i = name.find('<')
+        if i >= 0:
+            return name[:i]
+    return name
+
+
+def _matching_base_names(name, base_names):
+    """Return the members of base_names that a (possibly qualified or templated) type name refers to."""
+    if not name:
+        return set()
+    name = _strip_template_args(name).strip()
+    return {n for n in (name.split('::')[-1], name) if n in base_names}
+
+
+# Inherited base names per (cursor hash, base names), valid for one translation unit
+_INHERITED_BASES_CACHE = {}
+
+
+def clear_inheritance_cache():
+    """Drop memoized AST inheritance results; cursor hashes are only unique within one TU."""
+    _INHERITED_BASES_CACHE.clear()
+
+
+def get_inherited_base_names(node, base_names, seen=None, children=None):
+    """Return the subset of base_names that node inherits from using AST, following intermediate bases.
+    Results are memoized per declaration, so shared bases are only walked once per TU.
+    children may be passed when the caller already collected the node's children.
+    """
+    base_names = frozenset(base_names)
     if seen is None:
         seen = set()
 
     node_id = node.hash if hasattr(node, 'hash') else id(node)
+    key = (node_id, base_names)
+    cached = _INHERITED_BASES_CACHE.get(key)
+    if cached is not None and cached[0] == node:
+        return set(cached[1])
+    # seen only holds the declarations on the current path, to stop cycles
     if node_id in seen:
-        return False
+        return set()
     seen.add(node_id)
 
-    for child in node.get_children():
-        if child.kind != clang.cindex.CursorKind.CXX_BASE_SPECIFIER: # type: ignore
-            continue
-        
-        candidates = []
+    if children is None:
+        children = collect_class_children(node)
+
+    matches = set()
+    for child in children.base_specifiers:
+        # Spellings available on the specifier itself are checked before any declaration lookup
+        # Each cursor property read is a libclang call, so read them once
+        child_type = child.type
+        matches |= _matching_base_names(child.displayname, base_names)
+        matches |= _matching_base_names(child_type.spelling, base_names)
+        if len(matches) == len(base_names):
+            break
+
         try:
-            decl = child.type.get_declaration()
-            if decl and decl.spelling:
-                candidates.append(decl.spelling)
+            decl = child_type.get_declaration()
+            decl_name = decl.spelling if decl else None
+            if decl_name:
+                matches |= _matching_base_names(decl_name, base_names)
+                matches |= get_inherited_base_names(decl, base_names, seen)
         except Exception:
             pass
-        
-        if tsp := getattr(child.type, 'spelling', None):
-            candidates.append(tsp)
-        if disp := getattr(child, 'displayname', None):
-            candidates.append(disp)
-        
-        for name in candidates:
-            if not name:
+
+    seen.discard(node_id)
+    _INHERITED_BASES_CACHE[key] = (node, frozenset(matches))
+    return matches
+
+
+def _parse_base_clause(head):
+    """
+    Return the unqualified base class names in the text between a class name and its
+    opening brace, e.g. " : public ns::Base<T>, private Mixin" -> {"Base", "Mixin"}.
+    """
+    depth = 0
+    colon = None
+    for i, ch in enumerate(head):
+        if ch in '<(':
+            depth += 1
+        elif ch in '>)':
+            depth = max(0, depth - 1)
+        elif ch == ':' and depth == 0:
+            if head[i + 1:i + 2] == ':' or head[i - 1:i] == ':':
                 continue
-            name = re.sub(r'<.*>$', '', name).strip()
-            simple = name.split('::')[-1]
-            if simple == base_name or name == base_name:
-                return True
+            colon = i
+            break
+    if colon is None:
+        return set()
 
-        try:
-            decl = child.type.get_declaration()
-            if decl and decl.spelling and is_subclass_of(decl, base_name, seen):
-                return True
-        except Exception:
-            pass
-    return False
+    specifiers = []
+    depth = 0
+    start = colon + 1
+    for i in range(start, len(head)):
+        ch = head[i]
+        if ch in '<(':
+            depth += 1
+        elif ch in '>)':
+            depth = max(0, depth - 1)
+        elif ch == ',' and depth == 0:
+            specifiers.append(head[start:i])
+            start = i + 1
+    specifiers.append(head[start:])
+
+    names = set()
+    for spec in specifiers:
+        words = [w for w in spec.split('<', 1)[0].split() if w not in _BASE_SPECIFIER_KEYWORDS]
+        if words:
+            name = words[-1].rsplit('::', 1)[-1]
+            if name.isidentifier():
+                names.add(name)
+    return names
+
+
+def _blank_template_parameter_lists(text):
+    """
+    Replace every "template <...>" parameter list with spaces, so "class T" parameters
+    are not mistaken for class heads. Nested angle brackets are balanced, and brackets
+    inside parentheses (e.g. default arguments like (A > B)) are ignored.
+    """
+    pieces = []
+    pos = 0
+    for match in _RE_TEMPLATE_LIST_START.finditer(text):
+        if match.start() < pos:
+            continue  # Nested in a list that was already blanked
+        angle = parens = 0
+        end = len(text)
+        for i in range(match.end() - 1, len(text)):
+            ch = text[i]
+            if ch == '(':
+                parens += 1
+            elif ch == ')':
+                parens = max(0, parens - 1)
+            elif parens:
+                continue
+            elif ch == '<':
+                angle += 1
+            elif ch == '>':
+                angle -= 1
+                if angle == 0:
+                    end = i + 1
+                    break
+        pieces.append(text[pos:match.start()])
+        pieces.append(' ' * (end - match.start()))
+        pos = end
+    if not pieces:
+        return text
+    pieces.append(text[pos:])
+    return ''.join(pieces)
+
+
+def build_inheritance_index(header_path):
+    """
+    Map every class name in a header to the names of its direct base classes, in a
+    single pass over the source text. Results are cached per header.
+    """
+    index = _INHERITANCE_INDEX_CACHE.get(header_path)
+    if index is not None:
+        return index
+
+    index = {}
+    text = _blank_template_parameter_lists(read_header_text(header_path))
+    for match in _RE_CLASS_HEAD.finditer(text):
+        head = match.group(2)
+        if ':' in head:
+            index.setdefault(match.group(1), set()).update(_parse_base_clause(head))
+
+    _INHERITANCE_INDEX_CACHE[header_path] = index
+    return index
 
 
 def text_inherits(header_path, node_name, base_name):
     """Fallback: check inheritance via regex in source text."""
     try:
-        with open(header_path, 'r') as f:
-            txt = f.read()
+        index = build_inheritance_index(header_path)
     except Exception:
         return False
-    
-    pattern = rf"class\s+{re.escape(node_name)}[^{{]*:\s*[^{{;]*\b{re.escape(base_name)}\b"
-    return re.search(pattern, txt, flags=re.MULTILINE | re.DOTALL) is not None
+    return base_name in index.get(node_name, ())
 
 
 def class_body_contains_pure_virtual(node, header_path):
@@ -450,18 +1051,13 @@ def class_body_contains_pure_virtual(node, header_path):
         return False
 
     try:
-        with open(header_path, 'r') as f:
-            lines = f.readlines()
+        lines = read_header_lines(header_path)
     except Exception:
         return False
 
     start_line = max(0, node.location.line - 1)
     text = ''.join(lines[start_line:])
-    class_match = re.search(
-        rf"\b(class|struct)\s+{re.escape(node.spelling)}\b.*?\{{",
-        text,
-        flags=re.MULTILINE | re.DOTALL,
-    )
+    class_match = _class_body_start_pattern(node.spelling).search(text)
     if not class_match:
         return False
 
@@ -476,15 +1072,7 @@ def class_body_contains_pure_virtual(node, header_path):
         idx += 1
 
     body = text[body_start:idx - 1] if depth == 0 else text[body_start:]
-    pure_virtual_pattern = (
-        r"\bvirtual\b[\s\S]*?\)\s*"
-        r"(?:const\s*)?"
-        r"(?:noexcept(?:\s*\([^)]*\))?\s*)?"
-        r"(?:override\s*)?"
-        r"(?:final\s*)?"
-        r"=\s*0\s*;"
-    )
-    return re.search(pure_virtual_pattern, body, flags=re.MULTILINE) is not None
+    return _RE_PURE_VIRTUAL.search(body) is not None
 
 
 def is_effectively_abstract(node, header_path):
@@ -498,32 +1086,31 @@ def is_effectively_abstract(node, header_path):
     return class_body_contains_pure_virtual(node, header_path)
 
 
-def is_base_class_declaration(node, class_name, current_file):
+def is_base_class_declaration(node, class_name, current_file, node_file=None, children=None):
     """
     Check if node declares the base class in current file.
+    node_file and children may be passed when the caller already resolved the
+    cursor's file or collected its children.
     Returns: (is_base_class, template_params)
     """
-    if node.kind not in (
-        clang.cindex.CursorKind.CLASS_DECL, # type: ignore
-        clang.cindex.CursorKind.STRUCT_DECL, # type: ignore
-        clang.cindex.CursorKind.CLASS_TEMPLATE, # type: ignore
-    ):
+    if node.kind not in _CLASS_KINDS:
         return False, []
     
-    name = re.sub(r'<.*>$', '', node.spelling or "").strip()
+    name = _strip_template_args(node.spelling or "").strip()
     simple = name.split('::')[-1]
     
     if simple != class_name and name != class_name:
         return False, []
     
-    node_file = str(node.location.file) if node.location.file else ""
-    if not (node_file.endswith(current_file) or current_file.endswith(node_file)):
+    if node_file is None:
+        node_file = str(node.location.file) if node.location.file else ""
+    if not is_in_current_file(node_file, current_file):
         return False, []
     
-    print(f"  {node.spelling} (defined in {node_file})")
-    template_params = get_template_parameters(node)
+    log(f"  {node.spelling} (defined in {node_file})")
+    template_params = get_template_parameters(node, children)
     if template_params:
-        print(f"    Template parameters: {template_params}")
+        log(f"    Template parameters: {template_params}")
     
     return True, template_params
 
@@ -545,28 +1132,33 @@ def extract_base_class_from_type(param_type, base_classes):
     """
     Extract base class name from a parameter type if it matches any known base class.
     Handles pointers, references, templates, and qualified names.
+    base_classes should be a set; other iterables are converted on each call.
     
     Example: "MLCouplingNormalization<In, Out>*" -> "MLCouplingNormalization"
     """
     # Remove pointer/reference/const/volatile qualifiers
-    clean_type = re.sub(r'\s*(const|volatile)\s+', '', param_type)
-    clean_type = re.sub(r'[*&]+\s*$', '', clean_type).strip()
+    clean_type = _RE_CV_QUALIFIER.sub('', param_type)
+    clean_type = _RE_PTR_REF_SUFFIX.sub('', clean_type).strip()
     
     # Extract base type name (before template arguments)
-    match = re.match(r'([^<]+)', clean_type)
+    match = _RE_NAME_BEFORE_TEMPLATE_ARGS.match(clean_type)
     if match:
         base_type = match.group(1).strip()
         # Remove namespace qualifiers and get simple name
         simple_name = base_type.split('::')[-1]
         
         # Check if it matches any base class
-        for base_class in base_classes:
-            if simple_name == base_class or base_type == base_class:
-                return base_class
+        if not isinstance(base_classes, (set, frozenset)):
+            base_classes = frozenset(base_classes)
+        if simple_name in base_classes:
+            return simple_name
+        if base_type in base_classes:
+            return base_type
     
     return None
 
 
+@functools.lru_cache(maxsize=None)
 def _normalize_type_for_display(typ: str) -> str:
     """Normalize type spacing for human-readable output.
     Removes spaces before/after pointer stars so `In *` -> `In*`,
@@ -574,18 +1166,17 @@ def _normalize_type_for_display(typ: str) -> str:
     """
     if not typ:
         return typ
-    # Remove spaces around '*'
-    typ = re.sub(r"\s*\*\s*", "*", typ)
-    # Collapse multiple spaces
-    typ = re.sub(r"\s+", " ", typ).strip()
-    return typ
+    # Collapse whitespace first, so at most one space is left on either side of a '*'
+    typ = ' '.join(typ.split())
+    return typ.replace(' *', '*').replace('* ', '*')
 
 
+@functools.lru_cache(maxsize=None)
 def _strip_cvref(param_type: str) -> str:
     """Strip top-level const/volatile and reference qualifiers from a type string."""
-    clean_type = re.sub(r'\s*(const|volatile)\s+', '', param_type)
-    clean_type = re.sub(r'([*&]+)\s*$', '', clean_type).strip()
-    return re.sub(r"\s+", " ", clean_type).strip()
+    clean_type = _RE_CV_QUALIFIER.sub('', param_type)
+    clean_type = _RE_PTR_REF_SUFFIX.sub('', clean_type).strip()
+    return _RE_WHITESPACE.sub(" ", clean_type).strip()
 
 
 # =============================================================================
@@ -594,119 +1185,175 @@ def _strip_cvref(param_type: str) -> str:
 
 def write_includes(f, base_classes, base_classes_found, found_classes):
     """Generate #include statements."""
-    f.write("#pragma once\n\n")
-    f.write("#include <string>\n#include <vector>\n#include <unordered_map>\n#include <iostream>\n#include <typeinfo>\n#include <type_traits>\n#include <limits>\n#include <cmath>\n#include <algorithm>\n#include <cctype>\n\n")
+    out = []
+    out.append("#pragma once\n\n")
+    out.append("#include <string>\n#include <vector>\n#include <string_view>\n#include <utility>\n#include <unordered_map>\n#include <iostream>\n#include <typeinfo>\n#include <typeindex>\n#include <type_traits>\n#include <limits>\n#include <cmath>\n#include <algorithm>\n#include <iterator>\n#include <cctype>\n\n")
     
+    # Headers declaring several classes are included once, at their first occurrence
+    included = set()
+
     # Base class includes
     for base_class in base_classes:
         if base_class in base_classes_found:
             path = normalize_include_path(base_classes_found[base_class])
-            f.write(f'#include "{path}" // {base_class} \n')
+            if path not in included:
+                included.add(path)
+                out.append(f'#include "{path}" // {base_class} \n')
     
     # Subclass includes
     for base_class in base_classes:
-        f.write(f'\n// Includes for subclasses of {base_class}\n')
+        out.append(f'\n// Includes for subclasses of {base_class}\n')
         for entry in found_classes[base_class]:
-            cls, h = entry[0], entry[1]
-            path = normalize_include_path(h)
-            f.write(f'#include "{path}" // {cls} \n')
+            path = normalize_include_path(entry.header)
+            if path not in included:
+                included.add(path)
+                out.append(f'#include "{path}" // {entry.name} \n')
     
-    f.write("\n\n\n")
+    out.append("\n\n\n")
+
+    f.write(''.join(out))
 
 def write_combined_lookup_function(f, categories):
-    
-    f.write("inline std::string resolve_class_name(const std::string& name_or_alias) {\n")
-    f.write("    // This function checks all categories for a matching name or alias and returns the resolved class name.\n")
-    f.write(f"    std::string resolved;\n")
+    out = []
+    out.append("inline std::string resolve_class_name(const std::string& name_or_alias) {\n")
+    out.append("    // This function checks all categories for a matching name or alias and returns the resolved class name.\n")
+    out.append(f"    std::string resolved;\n")
     
     for category in categories:
-        f.write(f"    resolved = resolve_{category}_class_name(name_or_alias);\n")
-        f.write(f"    if (resolved != name_or_alias) {{\n")
-        f.write(f"        return resolved;\n")
-        f.write(f"    }}\n")
+        out.append(f"    resolved = resolve_{category}_class_name(name_or_alias);\n")
+        out.append(f"    if (resolved != name_or_alias) {{\n")
+        out.append(f"        return resolved;\n")
+        out.append(f"    }}\n")
+
+    out.append("    return name_or_alias; // Return as-is if no mapping found in any category\n")
+    out.append("}\n\n")
 
-    f.write("    return name_or_alias; // Return as-is if no mapping found in any category\n")
-    f.write("}\n\n")
+    f.write(''.join(out))
     
     
-def write_lookup_functions(f, base_classes, base_class_categories, found_classes, class_metadata):
-    """Generate name/alias lookup functions."""
+def _cpp_escape(text):
+    """Escape backslashes and double quotes for use inside a C++ string literal."""
+    return text.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def _write_length_switch(out, key, pairs, on_match):
+    """
+    Append a switch on the length of key that compares it against the few known names of
+    that length and emits on_match(value) for the one that equals it. The first entry wins
+    for duplicate names.
+    """
+    by_length = {}
+    seen = set()
+    for k, v in pairs:
+        if k not in seen:
+            seen.add(k)
+            # Case labels are std::string sizes, i.e. UTF-8 byte counts
+            by_length.setdefault(len(k.encode('utf-8')), []).append((k, v))
+
+    if not by_length:
+        return
+    out.append(f"    switch ({key}.size()) {{\n")
+    for length in sorted(by_length):
+        out.append(f"        case {length}:\n")
+        for k, v in by_length[length]:
+            out.append(f'            if ({key} == "{_cpp_escape(k)}") {on_match(v)}\n')
+        out.append("            break;\n")
+    out.append("    }\n")
+
+
+def _write_string_lookup(out, key, pairs, fallback_comment):
+    """
+    Append the body of a string -> string lookup that switches on the length of key and
+    compares against the few known names of that length. The first entry wins for
+    duplicate keys.
+    """
+    _write_length_switch(out, key, pairs, lambda value: f'return "{value}";')
+    out.append(f"    return {key}; // {fallback_comment}\n")
+    out.append("}\n\n")
+
+
+def _write_sorted_table_lookup(out, key, value_type, groups):
+    """
+    Append the body of a lookup that binary-searches key in a sorted constexpr index and
+    returns a reference to the matching entry of a static table of value_type, built once
+    on first use. groups is a list of (name, [item literal, ...]); the first group wins
+    for duplicate names.
+    """
+    tables = {}
+    for name, items in groups:
+        tables.setdefault(name, items)
+
+    out.append(f"    static const {value_type} none;\n")
+    # Names without items resolve the same as unknown names, so only index the others
+    index = sorted((name for name, items in tables.items() if items), key=lambda name: name.encode('utf-8'))
+    if not index:
+        out.append("    return none;\n")
+        out.append("}\n\n")
+        return
+
+    out.append(f"    static const {value_type} values[] = {{\n")
+    for name in index:
+        out.append(f"        {{{', '.join(tables[name])}}},\n")
+    out.append("    };\n")
+    out.append("    static constexpr std::string_view index[] = {\n")
+    for name in index:
+        out.append(f'        "{_cpp_escape(name)}",\n')
+    out.append("    };\n\n")
+    out.append(f"    const std::string_view name({key});\n")
+    out.append("    const auto* it = std::lower_bound(std::begin(index), std::end(index), name);\n")
+    out.append("    if (it == std::end(index) || *it != name) return none;\n")
+    out.append("    return values[it - std::begin(index)];\n")
+    out.append("}\n\n")
+
+
+def write_lookup_functions(f, base_classes, base_class_categories, lookup_pairs):
+    """
+    Generate name/alias lookup functions. lookup_pairs maps each base class to its
+    (registry name or alias, class name) pairs.
+    """
+    out = []
     for base_class in base_classes:
         category = base_class_categories.get(base_class, base_class.lower())
         
-        f.write(f"// Lookup function for {base_class} ({category})\n")
-        f.write(f"// Maps registry names and aliases to actual class names\n")
-        f.write(f"inline std::string resolve_{category}_class_name(const std::string& name_or_alias) {{\n")
-        f.write(f"    static const std::unordered_map<std::string, std::string> lookup = {{\n")
+        out.append(f"// Lookup function for {base_class} ({category})\n")
+        out.append(f"// Maps registry names and aliases to actual class names\n")
+        out.append(f"inline std::string resolve_{category}_class_name(const std::string& name_or_alias) {{\n")
         
-        for entry in found_classes[base_class]:
-            cls = entry[0]
-            if cls in base_classes:
-                continue
-            
-            metadata = class_metadata[base_class].get(cls, {})
-            if 'registry_name' in metadata:
-                f.write(f'        {{"{metadata["registry_name"]}", "{cls}"}},\n')
-            for alias in metadata.get('aliases', []):
-                f.write(f'        {{"{alias}", "{cls}"}},\n')
-        
-        f.write("    };\n\n")
-        f.write("    auto it = lookup.find(name_or_alias);\n")
-        f.write("    if (it != lookup.end()) {\n")
-        f.write("        return it->second;\n")
-        f.write("    }\n")
-        f.write("    return name_or_alias; // Return as-is if no mapping found\n")
-        f.write("}\n\n")
+        _write_string_lookup(out, "name_or_alias", lookup_pairs[base_class], "Return as-is if no mapping found")
+
+    f.write(''.join(out))
 
 
 def write_category_lookup(f, base_classes, base_class_categories):
     """Generate category to base class lookup function."""
-    f.write("// Lookup function to resolve category names to base class names\n")
-    f.write("inline std::string resolve_category_to_base_class(const std::string& category) {\n")
-    f.write("    static const std::unordered_map<std::string, std::string> lookup = {\n")
-    
-    for base_class in base_classes:
-        category = base_class_categories.get(base_class, base_class.lower())
-        f.write(f'        {{"{category}", "{base_class}"}},\n')
+    out = []
+    out.append("// Lookup function to resolve category names to base class names\n")
+    out.append("inline std::string resolve_category_to_base_class(const std::string& category) {\n")
     
-    f.write("    };\n\n")
-    f.write("    auto it = lookup.find(category);\n")
-    f.write("    if (it != lookup.end()) {\n")
-    f.write("        return it->second;\n")
-    f.write("    }\n")
-    f.write("    return category; // Return as-is if no mapping found\n")
-    f.write("}\n\n")
+    pairs = [(base_class_categories.get(base_class, base_class.lower()), base_class)
+             for base_class in base_classes]
+    _write_string_lookup(out, "category", pairs, "Return as-is if no mapping found")
+
+    f.write(''.join(out))
 
 
-def write_constructor_dependencies(f, base_classes, found_classes, subclass_constructors):
+def write_constructor_dependencies(f, base_classes, subclass_entries):
     """
     Generate function that returns constructor parameter dependencies.
     For each subclass, returns list of (base_class_type, param_name) pairs.
     """
-    f.write("// Get constructor parameter dependencies for a given class\n")
-    f.write("// Returns pairs of (base_class_type, parameter_name) for parameters that are base classes\n")
-    f.write("inline std::vector<std::pair<std::string, std::string>> get_constructor_dependencies(const std::string& class_name) {\n")
-    f.write("    std::vector<std::pair<std::string, std::string>> dependencies;\n\n")
-    
-    first_class = True
+    out = []
+    out.append("// Get constructor parameter dependencies for a given class\n")
+    out.append("// Returns pairs of (base_class_type, parameter_name) for parameters that are base classes\n")
+    out.append("inline const std::vector<std::pair<std::string, std::string>>& get_constructor_dependencies(const std::string& class_name) {\n")
+    base_class_set = frozenset(base_classes)
+    groups = []
     for base_class in base_classes:
-        for entry in found_classes[base_class]:
-            cls = entry[0]
-            if cls in base_classes:
-                continue
-            
-            if cls not in subclass_constructors[base_class]:
-                continue
-            
-            # Generate if-else chain
-            if first_class:
-                f.write(f'    if (class_name == "{cls}") {{\n')
-                first_class = False
-            else:
-                f.write(f'    }} else if (class_name == "{cls}") {{\n')
-            
+        for entry in subclass_entries[base_class]:
+            cls = entry.name
+            dependencies = []
             # Process all constructors (typically just one, but handle multiple)
-            constructors = subclass_constructors[base_class][cls]
+            constructors = entry.constructors
             if constructors and constructors != [[]]:
                 # Use the first constructor with parameters (or first constructor if all are empty)
                 selected_ctor = None
@@ -720,37 +1367,31 @@ def write_constructor_dependencies(f, base_classes, found_classes, subclass_cons
                 if selected_ctor:
                     for param_type, param_name, _ in selected_ctor:
                         # Check if this parameter type is one of our base classes
-                        matching_base = extract_base_class_from_type(param_type, base_classes)
+                        matching_base = extract_base_class_from_type(param_type, base_class_set)
                         if matching_base:
-                            f.write(f'        dependencies.push_back({{"{matching_base}", "{param_name}"}});\n')
-    
-    if not first_class:
-        f.write("    }\n\n")
+                            dependencies.append(f'{{"{matching_base}", "{param_name}"}}')
+            groups.append((cls, dependencies))
     
-    f.write("    return dependencies;\n")
-    f.write("}\n\n")
+    _write_sorted_table_lookup(out, "class_name", "std::vector<std::pair<std::string, std::string>>", groups)
+
+    f.write(''.join(out))
 
 
-def write_constructor_signatures(f, base_classes, found_classes, subclass_constructors):
+def write_constructor_signatures(f, base_classes, subclass_entries):
     """
     Generate function that returns human-friendly constructor signatures for a class.
     This is used to print help when provided arguments do not match any constructor.
     """
-    f.write("// Get constructor signatures for a given class (for help messages)\n")
-    f.write("inline std::vector<std::string> get_constructor_signatures(const std::string& class_name) {\n")
-    f.write("    std::vector<std::string> signatures;\n\n")
+    out = []
+    out.append("// Get constructor signatures for a given class (for help messages)\n")
+    out.append("inline const std::vector<std::string>& get_constructor_signatures(const std::string& class_name) {\n")
 
+    groups = []
     for base_class in base_classes:
-        for entry in found_classes[base_class]:
-            cls = entry[0]
-            if cls in base_classes:
-                continue
-
-            if cls not in subclass_constructors[base_class]:
-                continue
-
-            f.write(f'    if (class_name == "{cls}") {{\n')
-            ctors = subclass_constructors[base_class][cls]
+        for entry in subclass_entries[base_class]:
+            cls = entry.name
+            signatures = []
+            ctors = entry.constructors
             if ctors and ctors != [[]]:
                 for ctor in ctors:
                     parts = []
@@ -761,83 +1402,66 @@ def write_constructor_signatures(f, base_classes, found_classes, subclass_constr
                         else:
                             parts.append(f'{display_type} {pname}')
                     sig = f"{cls}({', '.join(parts)})"
-                    # Escape backslashes and double-quotes conservatively
-                    safe_sig = sig.replace('\\', '\\\\').replace('"', '\\"')
-                    f.write(f'        signatures.push_back("{safe_sig}");\n')
+                    signatures.append(f'"{_cpp_escape(sig)}"')
             else:
-                f.write(f'        signatures.push_back("{cls}()\");\n')
+                signatures.append(f'"{cls}()"')
+            groups.append((cls, signatures))
 
-            f.write("        return signatures;\n")
-            f.write("    }\n\n")
+    _write_sorted_table_lookup(out, "class_name", "std::vector<std::string>", groups)
 
-    f.write("    return signatures;\n")
-    f.write("}\n\n")
+    f.write(''.join(out))
 
 
 def write_print_constructor_help(f):
     """Generate a small helper that prints constructor signatures to stdout."""
-    f.write("// Print constructor help to console/log\n")
-    f.write("inline void print_constructor_help(const std::string& class_name) {\n")
-    f.write("    auto sigs = get_constructor_signatures(class_name);\n")
-    f.write("    if (sigs.empty()) { std::cout << \"No constructors found for \" << class_name << std::endl; return; }\n")
-    f.write("    std::cout << \"Available constructors for \" << class_name << \":\" << std::endl;\n")
-    f.write("    for (const auto &s : sigs) std::cout << \"  \" << s << std::endl;\n")
-    f.write("}\n\n")
+    out = []
+    out.append("// Print constructor help to console/log\n")
+    out.append("inline void print_constructor_help(const std::string& class_name) {\n")
+    out.append("    const auto& sigs = get_constructor_signatures(class_name);\n")
+    out.append("    if (sigs.empty()) { std::cout << \"No constructors found for \" << class_name << std::endl; return; }\n")
+    out.append("    std::cout << \"Available constructors for \" << class_name << \":\" << std::endl;\n")
+    out.append("    for (const auto &s : sigs) std::cout << \"  \" << s << std::endl;\n")
+    out.append("}\n\n")
+
+    f.write(''.join(out))
 
 
-def write_class_hierarchy_functions(f, base_classes, found_classes):
+def write_class_hierarchy_functions(f, base_classes, subclass_entries):
     """
     Generate functions to query class hierarchy:
     - get_subclasses(base_class_name): returns all subclasses of a base class
     - get_superclasses(class_name): returns all superclasses up the hierarchy
     """
-    # Map: subclass -> base class (for quick lookup)
+    out = []
+    # One pass for both directions: base class -> subclasses and subclass -> base class
+    subclass_groups = []
     subclass_to_base = {}
     for base_class in base_classes:
-        for entry in found_classes[base_class]:
-            cls = entry[0]
-            if cls not in base_classes:
-                subclass_to_base[cls] = base_class
+        subclasses = []
+        for entry in subclass_entries[base_class]:
+            subclasses.append(f'"{entry.name}"')
+            subclass_to_base[entry.name] = base_class
+        subclass_groups.append((base_class, subclasses))
     
     # Write get_subclasses function
-    f.write("// Get all subclasses of a given base class name\n")
-    f.write("inline std::vector<std::string> get_subclasses(const std::string& base_class_name) {\n")
-    f.write("    std::vector<std::string> subclasses;\n\n")
-    
-    for base_class in base_classes:
-        f.write(f'    if (base_class_name == "{base_class}") {{\n')
-        for entry in found_classes[base_class]:
-            cls = entry[0]
-            if cls not in base_classes:
-                f.write(f'        subclasses.push_back("{cls}");\n')
-        f.write("    }\n\n")
-    
-    f.write("    return subclasses;\n")
-    f.write("}\n\n")
+    out.append("// Get all subclasses of a given base class name\n")
+    out.append("inline const std::vector<std::string>& get_subclasses(const std::string& base_class_name) {\n")
+    _write_sorted_table_lookup(out, "base_class_name", "std::vector<std::string>", subclass_groups)
     
     # Write get_superclasses function
-    f.write("// Get all superclasses of a given class name (from subclass up to base class)\n")
-    f.write("inline std::vector<std::string> get_superclasses(const std::string& class_name) {\n")
-    f.write("    std::vector<std::string> superclasses;\n")
-    f.write("    static const std::unordered_map<std::string, std::string> hierarchy = {\n")
-    
-    for subclass, base_class in subclass_to_base.items():
-        f.write(f'        {{"{subclass}", "{base_class}"}},\n')
-    
-    f.write("    };\n\n")
-    f.write("    auto it = hierarchy.find(class_name);\n")
-    f.write("    if (it != hierarchy.end()) {\n")
-    f.write("        std::string current = it->second;\n")
-    f.write("        superclasses.push_back(current);\n")
-    f.write("        // Note: Currently only supports single inheritance (one level up).\n")
-    f.write("        // If multi-level hierarchies are needed, extend this recursively.\n")
-    f.write("    }\n")
-    f.write("    return superclasses;\n")
-    f.write("}\n\n")
+    out.append("// Get all superclasses of a given class name (from subclass up to base class)\n")
+    out.append("inline const std::vector<std::string>& get_superclasses(const std::string& class_name) {\n")
+    # Note: Currently only supports single inheritance (one level up).
+    # If multi-level hierarchies are needed, extend this recursively.
+    groups = [(subclass, [f'"{base_class}"']) for subclass, base_class in subclass_to_base.items()]
+    _write_sorted_table_lookup(out, "class_name", "std::vector<std::string>", groups)
+
+    f.write(''.join(out))
 
 
+@functools.lru_cache(maxsize=None)
 def _get_template_strings(base_class, template_params):
-    """Get template declaration and argument strings."""
+    """Get template declaration and argument strings. template_params must be a tuple."""
     if not template_params:
         return f"{base_class}*", ""
     
@@ -846,28 +1470,37 @@ def _get_template_strings(base_class, template_params):
     return f"template<{template_decl}>\n{base_class}<{template_args}>*", template_args
 
 
+@functools.lru_cache(maxsize=None)
 def _get_class_instantiation(cls, subclass_template_params, base_template_params):
-    """Get instantiation string for a class (with template args if needed)."""
+    """
+    Get instantiation string for a class (with template args if needed). Both parameter
+    lists must be tuples.
+    """
     if subclass_template_params:
         args = ", ".join(base_template_params[:len(subclass_template_params)])
         return f"{cls}<{args}>"
     return cls
 
 
-def write_type_identification_functions(f, base_classes, template_parameters, found_classes):
+# Number of known types from which get_type_name uses a hash map instead of a typeid chain
+TYPE_NAME_MAP_THRESHOLD = 8
+
+
+def write_type_identification_functions(f, base_classes, template_parameters, subclass_entries):
     """
     Generate typeid-based runtime type identification functions.
     For each base class, emits:
       get_type_name(const Base* obj)   -> std::string
       get_type_name(const Base& obj)   -> std::string  (delegates to pointer overload)
     """
-    f.write("// ---------------------------------------------------------------------------\n")
-    f.write("// Runtime type identification via typeid comparison\n")
-    f.write("// Returns the human-readable class name for a given (possibly polymorphic) object.\n")
-    f.write("// ---------------------------------------------------------------------------\n\n")
+    out = []
+    out.append("// ---------------------------------------------------------------------------\n")
+    out.append("// Runtime type identification via typeid comparison\n")
+    out.append("// Returns the human-readable class name for a given (possibly polymorphic) object.\n")
+    out.append("// ---------------------------------------------------------------------------\n\n")
 
     for base_class in base_classes:
-        base_template_params = template_parameters.get(base_class, [])
+        base_template_params = tuple(template_parameters.get(base_class, ()))
 
         if base_template_params:
             template_decl = ", ".join(f"typename {p}" for p in base_template_params)
@@ -883,226 +1516,275 @@ def write_type_identification_functions(f, base_classes, template_parameters, fo
             base_ref  = f"const {base_class}&"
 
         # --- pointer overload ---
-        f.write(f"{ptr_prefix}inline std::string get_type_name({base_ptr} obj) {{\n")
-        f.write("    if (!obj) return \"nullptr\";\n")
-
-        for entry in found_classes[base_class]:
-            cls, _, subclass_tparams = entry
-            if cls in base_classes:
-                continue
-            if subclass_tparams and base_template_params:
-                args = ", ".join(base_template_params[:len(subclass_tparams)])
-                cls_type = f"{cls}<{args}>"
+        out.append(f"{ptr_prefix}inline std::string get_type_name({base_ptr} obj) {{\n")
+        out.append("    if (!obj) return \"nullptr\";\n")
+
+        entries = []
+        for entry in subclass_entries[base_class]:
+            cls = entry.name
+            if base_template_params:
+                cls_type = _get_class_instantiation(cls, entry.template_params, base_template_params)
             else:
                 cls_type = cls
-            f.write(f'    if (typeid(*obj) == typeid({cls_type})) return "{cls}";\n')
+            entries.append((cls_type, cls))
 
         # Fallback: the base class itself (concrete or unknown derived)
         if base_template_params:
             base_type = f"{base_class}<{template_args}>"
         else:
             base_type = base_class
-        f.write(f'    if (typeid(*obj) == typeid({base_type})) return "{base_class}";\n')
-        f.write('    return "unknown";\n')
-        f.write("}\n\n")
+        entries.append((base_type, base_class))
+
+        if len(entries) < TYPE_NAME_MAP_THRESHOLD:
+            for cls_type, cls in entries:
+                out.append(f'    if (typeid(*obj) == typeid({cls_type})) return "{cls}";\n')
+        else:
+            # One hash lookup instead of a typeid comparison per known class
+            out.append("    static const std::unordered_map<std::type_index, std::string_view> types = {\n")
+            for cls_type, cls in entries:
+                out.append(f'        {{std::type_index(typeid({cls_type})), "{cls}"}},\n')
+            out.append("    };\n")
+            out.append("    auto it = types.find(std::type_index(typeid(*obj)));\n")
+            out.append("    if (it != types.end()) return std::string(it->second);\n")
+        out.append('    return "unknown";\n')
+        out.append("}\n\n")
 
         # --- reference overload (delegates) ---
-        f.write(f"{ptr_prefix}inline std::string get_type_name({base_ref} obj) {{\n")
-        f.write("    return get_type_name(&obj);\n")
-        f.write("}\n\n")
+        out.append(f"{ptr_prefix}inline std::string get_type_name({base_ref} obj) {{\n")
+        out.append("    return get_type_name(&obj);\n")
+        out.append("}\n\n")
+
+    f.write(''.join(out))
 
 
 def write_config_param_cast_helper(f):
     """Generate a template helper that casts a typed void* to a target type at runtime."""
-    f.write("enum class ConfigCastMode : int { Strict, Relaxed };\n\n")
-    f.write("inline ConfigCastMode& config_cast_mode_storage() {\n")
-    f.write("    static ConfigCastMode mode = ConfigCastMode::Relaxed;\n")
-    f.write("    return mode;\n")
-    f.write("}\n\n")
-    f.write("inline void set_config_cast_mode(ConfigCastMode mode) {\n")
-    f.write("    config_cast_mode_storage() = mode;\n")
-    f.write("}\n\n")
-    f.write("inline ConfigCastMode get_config_cast_mode() {\n")
-    f.write("    return config_cast_mode_storage();\n")
-    f.write("}\n\n")
-    f.write("inline std::string config_cast_to_lower(std::string value) {\n")
-    f.write("    std::transform(value.begin(), value.end(), value.begin(), [](unsigned char c) { return static_cast<char>(std::tolower(c)); });\n")
-    f.write("    return value;\n")
-    f.write("}\n\n")
-    f.write("inline bool config_try_parse_bool(const std::string& value, bool& out) {\n")
-    f.write("    auto lower = config_cast_to_lower(value);\n")
-    f.write("    if (lower == \"true\" || lower == \"1\") { out = true; return true; }\n")
-    f.write("    if (lower == \"false\" || lower == \"0\") { out = false; return true; }\n")
-    f.write("    return false;\n")
-    f.write("}\n\n")
-    f.write("template<typename T>\n")
-    f.write("inline T config_cast_from_int64(int64_t value, ConfigCastMode mode) {\n")
-    f.write("    if constexpr (std::is_same_v<T, bool>) {\n")
-    f.write("        if (mode == ConfigCastMode::Strict && value != 0 && value != 1) {\n")
-    f.write("            throw std::runtime_error(\"Strict cast failed: int64_t to bool requires 0 or 1.\");\n")
-    f.write("        }\n")
-    f.write("        return value != 0;\n")
-    f.write("    } else if constexpr (std::is_integral_v<T>) {\n")
-    f.write("        if (value < static_cast<int64_t>(std::numeric_limits<T>::min()) || value > static_cast<int64_t>(std::numeric_limits<T>::max())) {\n")
-    f.write("            throw std::runtime_error(\"Cast failed: int64_t value out of range for target integral type.\");\n")
-    f.write("        }\n")
-    f.write("        return static_cast<T>(value);\n")
-    f.write("    } else if constexpr (std::is_floating_point_v<T>) {\n")
-    f.write("        return static_cast<T>(value);\n")
-    f.write("    } else if constexpr (std::is_same_v<T, std::string>) {\n")
-    f.write("        if (mode == ConfigCastMode::Strict) {\n")
-    f.write("            throw std::runtime_error(\"Strict cast failed: int64_t to string is not allowed.\");\n")
-    f.write("        }\n")
-    f.write("        return std::to_string(value);\n")
-    f.write("    }\n")
-    f.write("    throw std::runtime_error(\"Unsupported target type for int64_t config cast.\");\n")
-    f.write("}\n\n")
-    f.write("template<typename T>\n")
-    f.write("inline T config_cast_from_double(double value, ConfigCastMode mode) {\n")
-    f.write("    if constexpr (std::is_same_v<T, bool>) {\n")
-    f.write("        if (mode == ConfigCastMode::Strict && value != 0.0 && value != 1.0) {\n")
-    f.write("            throw std::runtime_error(\"Strict cast failed: double to bool requires 0.0 or 1.0.\");\n")
-    f.write("        }\n")
-    f.write("        return value != 0.0;\n")
-    f.write("    } else if constexpr (std::is_integral_v<T>) {\n")
-    f.write("        if (mode == ConfigCastMode::Strict && std::floor(value) != value) {\n")
-    f.write("            throw std::runtime_error(\"Strict cast failed: double to integral requires an integer-valued source.\");\n")
-    f.write("        }\n")
-    f.write("        if (value < static_cast<double>(std::numeric_limits<T>::min()) || value > static_cast<double>(std::numeric_limits<T>::max())) {\n")
-    f.write("            throw std::runtime_error(\"Cast failed: double value out of range for target integral type.\");\n")
-    f.write("        }\n")
-    f.write("        return static_cast<T>(value);\n")
-    f.write("    } else if constexpr (std::is_floating_point_v<T>) {\n")
-    f.write("        if constexpr (std::is_same_v<T, float>) {\n")
-    f.write("            if (mode == ConfigCastMode::Strict && (value < -std::numeric_limits<float>::max() || value > std::numeric_limits<float>::max())) {\n")
-    f.write("                throw std::runtime_error(\"Strict cast failed: double out of range for float.\");\n")
-    f.write("            }\n")
-    f.write("        }\n")
-    f.write("        return static_cast<T>(value);\n")
-    f.write("    } else if constexpr (std::is_same_v<T, std::string>) {\n")
-    f.write("        if (mode == ConfigCastMode::Strict) {\n")
-    f.write("            throw std::runtime_error(\"Strict cast failed: double to string is not allowed.\");\n")
-    f.write("        }\n")
-    f.write("        return std::to_string(value);\n")
-    f.write("    }\n")
-    f.write("    throw std::runtime_error(\"Unsupported target type for double config cast.\");\n")
-    f.write("}\n\n")
-    f.write("template<typename T>\n")
-    f.write("inline T config_cast_from_bool(bool value, ConfigCastMode mode) {\n")
-    f.write("    if constexpr (std::is_same_v<T, bool>) {\n")
-    f.write("        return value;\n")
-    f.write("    } else if constexpr (std::is_integral_v<T> || std::is_floating_point_v<T>) {\n")
-    f.write("        if (mode == ConfigCastMode::Strict) {\n")
-    f.write("            throw std::runtime_error(\"Strict cast failed: bool to numeric is not allowed.\");\n")
-    f.write("        }\n")
-    f.write("        return static_cast<T>(value ? 1 : 0);\n")
-    f.write("    } else if constexpr (std::is_same_v<T, std::string>) {\n")
-    f.write("        if (mode == ConfigCastMode::Strict) {\n")
-    f.write("            throw std::runtime_error(\"Strict cast failed: bool to string is not allowed.\");\n")
-    f.write("        }\n")
-    f.write("        return value ? std::string(\"true\") : std::string(\"false\");\n")
-    f.write("    }\n")
-    f.write("    throw std::runtime_error(\"Unsupported target type for bool config cast.\");\n")
-    f.write("}\n\n")
-    f.write("template<typename T>\n")
-    f.write("inline T config_cast_from_string(const std::string& value, ConfigCastMode mode) {\n")
-    f.write("    if constexpr (std::is_same_v<T, std::string>) {\n")
-    f.write("        return value;\n")
-    f.write("    }\n")
-    f.write("\n")
-    f.write("    if (mode == ConfigCastMode::Strict) {\n")
-    f.write("        throw std::runtime_error(\"Strict cast failed: string source only supports std::string target.\");\n")
-    f.write("    }\n")
-    f.write("\n")
-    f.write("    if constexpr (std::is_same_v<T, bool>) {\n")
-    f.write("        bool parsed = false;\n")
-    f.write("        if (!config_try_parse_bool(value, parsed)) {\n")
-    f.write("            throw std::runtime_error(\"Relaxed cast failed: could not parse string as bool: \" + value);\n")
-    f.write("        }\n")
-    f.write("        return parsed;\n")
-    f.write("    }\n")
-    f.write("\n")
-    f.write("    if constexpr (std::is_integral_v<T>) {\n")
-    f.write("        size_t pos = 0;\n")
-    f.write("        long long parsed = std::stoll(value, &pos);\n")
-    f.write("        if (pos != value.size()) {\n")
-    f.write("            throw std::runtime_error(\"Relaxed cast failed: trailing characters in integral string: \" + value);\n")
-    f.write("        }\n")
-    f.write("        if (parsed < static_cast<long long>(std::numeric_limits<T>::min()) || parsed > static_cast<long long>(std::numeric_limits<T>::max())) {\n")
-    f.write("            throw std::runtime_error(\"Relaxed cast failed: parsed integer out of target range.\");\n")
-    f.write("        }\n")
-    f.write("        return static_cast<T>(parsed);\n")
-    f.write("    }\n")
-    f.write("\n")
-    f.write("    if constexpr (std::is_floating_point_v<T>) {\n")
-    f.write("        size_t pos = 0;\n")
-    f.write("        double parsed = std::stod(value, &pos);\n")
-    f.write("        if (pos != value.size()) {\n")
-    f.write("            throw std::runtime_error(\"Relaxed cast failed: trailing characters in floating string: \" + value);\n")
-    f.write("        }\n")
-    f.write("        return static_cast<T>(parsed);\n")
-    f.write("    }\n")
-    f.write("\n")
-    f.write("    throw std::runtime_error(\"Unsupported target type for string config cast.\");\n")
-    f.write("}\n\n")
-    f.write("// Helper to extract and cast a config parameter based on its runtime type tag.\n")
-    f.write("// Type tags: 0 = no static cast, 1 = int64_t, 2 = double, 3 = std::string (char*), 4 = bool\n")
-    f.write("template<typename T>\n")
-    f.write("T config_param_cast(const std::pair<int, void*>& param) {\n")
-    f.write("    const auto mode = get_config_cast_mode();\n")
-    f.write("    switch (param.first) {\n")
-    f.write("        case 0:\n")
-    f.write("            return *reinterpret_cast<T*>(param.second); // No static cast, just reinterpret\n")
-    f.write("        case 1:\n")
-    f.write("            return config_cast_from_int64<T>(*reinterpret_cast<int64_t*>(param.second), mode);\n")
-    f.write("        case 2:\n")
-    f.write("            return config_cast_from_double<T>(*reinterpret_cast<double*>(param.second), mode);\n")
-    f.write("        case 3:\n")
-    f.write("            return config_cast_from_string<T>(std::string(reinterpret_cast<char*>(param.second)), mode);\n")
-    f.write("        case 4:\n")
-    f.write("            return config_cast_from_bool<T>(*reinterpret_cast<bool*>(param.second), mode);\n")
-    f.write("        default:\n")
-    f.write("            throw std::runtime_error(\"Unsupported type tag for config cast: \" + std::to_string(param.first));\n")
-    f.write("    }\n")
-    f.write("}\n\n")
+    out = []
+    out.append("enum class ConfigCastMode : int { Strict, Relaxed };\n\n")
+    out.append("inline ConfigCastMode& config_cast_mode_storage() {\n")
+    out.append("    static ConfigCastMode mode = ConfigCastMode::Relaxed;\n")
+    out.append("    return mode;\n")
+    out.append("}\n\n")
+    out.append("inline void set_config_cast_mode(ConfigCastMode mode) {\n")
+    out.append("    config_cast_mode_storage() = mode;\n")
+    out.append("}\n\n")
+    out.append("inline ConfigCastMode get_config_cast_mode() {\n")
+    out.append("    return config_cast_mode_storage();\n")
+    out.append("}\n\n")
+    out.append("inline std::string config_cast_to_lower(std::string value) {\n")
+    out.append("    std::transform(value.begin(), value.end(), value.begin(), [](unsigned char c) { return static_cast<char>(std::tolower(c)); });\n")
+    out.append("    return value;\n")
+    out.append("}\n\n")
+    out.append("inline bool config_try_parse_bool(const std::string& value, bool& out) {\n")
+    out.append("    auto lower = config_cast_to_lower(value);\n")
+    out.append("    if (lower == \"true\" || lower == \"1\") { out = true; return true; }\n")
+    out.append("    if (lower == \"false\" || lower == \"0\") { out = false; return true; }\n")
+    out.append("    return false;\n")
+    out.append("}\n\n")
+    out.append("template<typename T>\n")
+    out.append("inline T config_cast_from_int64(int64_t value, ConfigCastMode mode) {\n")
+    out.append("    if constexpr (std::is_same_v<T, bool>) {\n")
+    out.append("        if (mode == ConfigCastMode::Strict && value != 0 && value != 1) {\n")
+    out.append("            throw std::runtime_error(\"Strict cast failed: int64_t to bool requires 0 or 1.\");\n")
+    out.append("        }\n")
+    out.append("        return value != 0;\n")
+    out.append("    } else if constexpr (std::is_integral_v<T>) {\n")
+    out.append("        if (value < static_cast<int64_t>(std::numeric_limits<T>::min()) || value > static_cast<int64_t>(std::numeric_limits<T>::max())) {\n")
+    out.append("            throw std::runtime_error(\"Cast failed: int64_t value out of range for target integral type.\");\n")
+    out.append("        }\n")
+    out.append("        return static_cast<T>(value);\n")
+    out.append("    } else if constexpr (std::is_floating_point_v<T>) {\n")
+    out.append("        return static_cast<T>(value);\n")
+    out.append("    } else if constexpr (std::is_same_v<T, std::string>) {\n")
+    out.append("        if (mode == ConfigCastMode::Strict) {\n")
+    out.append("            throw std::runtime_error(\"Strict cast failed: int64_t to string is not allowed.\");\n")
+    out.append("        }\n")
+    out.append("        return std::to_string(value);\n")
+    out.append("    }\n")
+    out.append("    throw std::runtime_error(\"Unsupported target type for int64_t config cast.\");\n")
+    out.append("}\n\n")
+    out.append("template<typename T>\n")
+    out.append("inline T config_cast_from_double(double value, ConfigCastMode mode) {\n")
+    out.append("    if constexpr (std::is_same_v<T, bool>) {\n")
+    out.append("        if (mode == ConfigCastMode::Strict && value != 0.0 && value != 1.0) {\n")
+    out.append("            throw std::runtime_error(\"Strict cast failed: double to bool requires 0.0 or 1.0.\");\n")
+    out.append("        }\n")
+    out.append("        return value != 0.0;\n")
+    out.append("    } else if constexpr (std::is_integral_v<T>) {\n")
+    out.append("        if (mode == ConfigCastMode::Strict && std::floor(value) != value) {\n")
+    out.append("            throw std::runtime_error(\"Strict cast failed: double to integral requires an integer-valued source.\");\n")
+    out.append("        }\n")
+    out.append("        if (value < static_cast<double>(std::numeric_limits<T>::min()) || value > static_cast<double>(std::numeric_limits<T>::max())) {\n")
+    out.append("            throw std::runtime_error(\"Cast failed: double value out of range for target integral type.\");\n")
+    out.append("        }\n")
+    out.append("        return static_cast<T>(value);\n")
+    out.append("    } else if constexpr (std::is_floating_point_v<T>) {\n")
+    out.append("        if constexpr (std::is_same_v<T, float>) {\n")
+    out.append("            if (mode == ConfigCastMode::Strict && (value < -std::numeric_limits<float>::max() || value > std::numeric_limits<float>::max())) {\n")
+    out.append("                throw std::runtime_error(\"Strict cast failed: double out of range for float.\");\n")
+    out.append("            }\n")
+    out.append("        }\n")
+    out.append("        return static_cast<T>(value);\n")
+    out.append("    } else if constexpr (std::is_same_v<T, std::string>) {\n")
+    out.append("        if (mode == ConfigCastMode::Strict) {\n")
+    out.append("            throw std::runtime_error(\"Strict cast failed: double to string is not allowed.\");\n")
+    out.append("        }\n")
+    out.append("        return std::to_string(value);\n")
+    out.append("    }\n")
+    out.append("    throw std::runtime_error(\"Unsupported target type for double config cast.\");\n")
+    out.append("}\n\n")
+    out.append("template<typename T>\n")
+    out.append("inline T config_cast_from_bool(bool value, ConfigCastMode mode) {\n")
+    out.append("    if constexpr (std::is_same_v<T, bool>) {\n")
+    out.append("        return value;\n")
+    out.append("    } else if constexpr (std::is_integral_v<T> || std::is_floating_point_v<T>) {\n")
+    out.append("        if (mode == ConfigCastMode::Strict) {\n")
+    out.append("            throw std::runtime_error(\"Strict cast failed: bool to numeric is not allowed.\");\n")
+    out.append("        }\n")
+    out.append("        return static_cast<T>(value ? 1 : 0);\n")
+    out.append("    } else if constexpr (std::is_same_v<T, std::string>) {\n")
+    out.append("        if (mode == ConfigCastMode::Strict) {\n")
+    out.append("            throw std::runtime_error(\"Strict cast failed: bool to string is not allowed.\");\n")
+    out.append("        }\n")
+    out.append("        return value ? std::string(\"true\") : std::string(\"false\");\n")
+    out.append("    }\n")
+    out.append("    throw std::runtime_error(\"Unsupported target type for bool config cast.\");\n")
+    out.append("}\n\n")
+    out.append("template<typename T>\n")
+    out.append("inline T config_cast_from_string(const std::string& value, ConfigCastMode mode) {\n")
+    out.append("    if constexpr (std::is_same_v<T, std::string>) {\n")
+    out.append("        return value;\n")
+    out.append("    }\n")
+    out.append("\n")
+    out.append("    if (mode == ConfigCastMode::Strict) {\n")
+    out.append("        throw std::runtime_error(\"Strict cast failed: string source only supports std::string target.\");\n")
+    out.append("    }\n")
+    out.append("\n")
+    out.append("    if constexpr (std::is_same_v<T, bool>) {\n")
+    out.append("        bool parsed = false;\n")
+    out.append("        if (!config_try_parse_bool(value, parsed)) {\n")
+    out.append("            throw std::runtime_error(\"Relaxed cast failed: could not parse string as bool: \" + value);\n")
+    out.append("        }\n")
+    out.append("        return parsed;\n")
+    out.append("    }\n")
+    out.append("\n")
+    out.append("    if constexpr (std::is_integral_v<T>) {\n")
+    out.append("        size_t pos = 0;\n")
+    out.append("        long long parsed = std::stoll(value, &pos);\n")
+    out.append("        if (pos != value.size()) {\n")
+    out.append("            throw std::runtime_error(\"Relaxed cast failed: trailing characters in integral string: \" + value);\n")
+    out.append("        }\n")
+    out.append("        if (parsed < static_cast<long long>(std::numeric_limits<T>::min()) || parsed > static_cast<long long>(std::numeric_limits<T>::max())) {\n")
+    out.append("            throw std::runtime_error(\"Relaxed cast failed: parsed integer out of target range.\");\n")
+    out.append("        }\n")
+    out.append("        return static_cast<T>(parsed);\n")
+    out.append("    }\n")
+    out.append("\n")
+    out.append("    if constexpr (std::is_floating_point_v<T>) {\n")
+    out.append("        size_t pos = 0;\n")
+    out.append("        double parsed = std::stod(value, &pos);\n")
+    out.append("        if (pos != value.size()) {\n")
+    out.append("            throw std::runtime_error(\"Relaxed cast failed: trailing characters in floating string: \" + value);\n")
+    out.append("        }\n")
+    out.append("        return static_cast<T>(parsed);\n")
+    out.append("    }\n")
+    out.append("\n")
+    out.append("    throw std::runtime_error(\"Unsupported target type for string config cast.\");\n")
+    out.append("}\n\n")
+    out.append("// Per-tag casters, indexed by the runtime type tag in config_param_cast.\n")
+    out.append("template<typename T>\n")
+    out.append("inline T config_param_cast_raw(void* value, ConfigCastMode) {\n")
+    out.append("    return *reinterpret_cast<T*>(value); // No static cast, just reinterpret\n")
+    out.append("}\n\n")
+    out.append("template<typename T>\n")
+    out.append("inline T config_param_cast_int64(void* value, ConfigCastMode mode) {\n")
+    out.append("    return config_cast_from_int64<T>(*reinterpret_cast<int64_t*>(value), mode);\n")
+    out.append("}\n\n")
+    out.append("template<typename T>\n")
+    out.append("inline T config_param_cast_double(void* value, ConfigCastMode mode) {\n")
+    out.append("    return config_cast_from_double<T>(*reinterpret_cast<double*>(value), mode);\n")
+    out.append("}\n\n")
+    out.append("template<typename T>\n")
+    out.append("inline T config_param_cast_string(void* value, ConfigCastMode mode) {\n")
+    out.append("    return config_cast_from_string<T>(std::string(reinterpret_cast<char*>(value)), mode);\n")
+    out.append("}\n\n")
+    out.append("template<typename T>\n")
+    out.append("inline T config_param_cast_bool(void* value, ConfigCastMode mode) {\n")
+    out.append("    return config_cast_from_bool<T>(*reinterpret_cast<bool*>(value), mode);\n")
+    out.append("}\n\n")
+    out.append("// Helper to extract and cast a config parameter based on its runtime type tag.\n")
+    out.append("// Type tags: 0 = no static cast, 1 = int64_t, 2 = double, 3 = std::string (char*), 4 = bool\n")
+    out.append("template<typename T>\n")
+    out.append("T config_param_cast(const std::pair<int, void*>& param) {\n")
+    out.append("    using Caster = T (*)(void*, ConfigCastMode);\n")
+    out.append("    static constexpr Caster casters[] = {\n")
+    out.append("        &config_param_cast_raw<T>,\n")
+    out.append("        &config_param_cast_int64<T>,\n")
+    out.append("        &config_param_cast_double<T>,\n")
+    out.append("        &config_param_cast_string<T>,\n")
+    out.append("        &config_param_cast_bool<T>,\n")
+    out.append("    };\n")
+    out.append("    // Negative tags wrap around to large unsigned values and fail the same check\n")
+    out.append("    if (static_cast<std::size_t>(static_cast<unsigned int>(param.first)) >= std::size(casters)) {\n")
+    out.append("        throw std::runtime_error(\"Unsupported type tag for config cast: \" + std::to_string(param.first));\n")
+    out.append("    }\n")
+    out.append("    return casters[param.first](param.second, get_config_cast_mode());\n")
+    out.append("}\n\n")
+
+    f.write(''.join(out))
 
 
 def write_factory_functions(f, base_classes, template_parameters, base_class_categories,
-                            found_classes, subclass_constructors):
+                            subclass_entries):
     """Generate factory functions for creating instances."""
     for base_class in base_classes:
-        base_template_params = template_parameters.get(base_class, ['In', 'Out'])
+        base_template_params = tuple(template_parameters.get(base_class, ('In', 'Out')))
         template_str, template_args = _get_template_strings(base_class, base_template_params)
         category = base_class_categories.get(base_class, base_class.lower())
         
-        # Filter valid entries
-        entries = [(cls, h, tparams) for cls, h, tparams in found_classes[base_class]
-                   if cls not in base_classes and cls in subclass_constructors[base_class]]
-        
         # Map-based factory with name resolution
         _write_map_factory(f, base_class, template_str, template_args, category,
-                           base_template_params, entries, subclass_constructors)
+                           base_template_params, subclass_entries[base_class])
+
 
+# Pointee types that _is_pointer_to_known_class does not treat as classes
+_PRIMITIVE_POINTEE_TYPES = frozenset((
+    'int', 'float', 'double', 'bool', 'char', 'int64_t', 'int32_t',
+    'uint64_t', 'uint32_t', 'size_t', 'std::string',
+))
 
+# Value types config_param_cast<T> can convert to
+_CONFIG_PARAM_CAST_TYPES = frozenset((
+    'bool', 'char',
+    'short', 'unsigned short',
+    'int', 'unsigned int',
+    'long', 'unsigned long',
+    'long long', 'unsigned long long',
+    'int32_t', 'uint32_t', 'int64_t', 'uint64_t', 'size_t',
+    'float', 'double',
+    'std::string', 'string',
+))
+
+
+@functools.lru_cache(maxsize=None)
 def _is_mlcoupling_data_type(param_type):
     """Check if parameter type is MLCouplingData<...>."""
-    clean_type = re.sub(r'\s*(const|volatile)\s+', '', param_type)
-    clean_type = re.sub(r'[*&]+\s*$', '', clean_type).strip()
+    clean_type = _RE_CV_QUALIFIER.sub('', param_type)
+    clean_type = _RE_PTR_REF_SUFFIX.sub('', clean_type).strip()
     return clean_type.startswith('MLCouplingData<')
 
 
+@functools.lru_cache(maxsize=None)
 def _is_pointer_to_known_class(param_type):
     """Check if parameter type is a pointer to a known class (not a primitive)."""
     clean_type = param_type.strip()
     if not clean_type.endswith('*'):
         return False
     # Remove the pointer and check if it's a class-like type (starts with uppercase or MLCoupling)
-    base_type = re.sub(r'[*&]+\s*$', '', clean_type).strip()
-    base_type = re.sub(r'<.*>$', '', base_type).strip()
+    base_type = _RE_PTR_REF_SUFFIX.sub('', clean_type).strip()
+    base_type = _strip_template_args(base_type).strip()
     # Primitive types and their variants are not "known classes"
-    primitives = {'int', 'float', 'double', 'bool', 'char', 'int64_t', 'int32_t',
-                  'uint64_t', 'uint32_t', 'size_t', 'std::string'}
-    return base_type not in primitives and not base_type.startswith('std::')
+    return base_type not in _PRIMITIVE_POINTEE_TYPES and not base_type.startswith('std::')
 
 
 def _is_reference_type(param_type):
@@ -1112,208 +1794,580 @@ def _is_reference_type(param_type):
 
 def _can_use_config_param_cast(param_type):
     """Return True if parameter type is supported by config_param_cast<T>."""
-    clean_type = _strip_cvref(param_type)
-
-    supported = {
-        'bool', 'char',
-        'short', 'unsigned short',
-        'int', 'unsigned int',
-        'long', 'unsigned long',
-        'long long', 'unsigned long long',
-        'int32_t', 'uint32_t', 'int64_t', 'uint64_t', 'size_t',
-        'float', 'double',
-        'std::string', 'string',
-    }
-    return clean_type in supported
+    return _strip_cvref(param_type) in _CONFIG_PARAM_CAST_TYPES
+
+# (argument, debug output) snippets for one constructor parameter, by how it is extracted.
+# {t} is the type to cast to, {n} the parameter name, {d} its default and {a} the argument.
+_PARAM_EXTRACTION_TEMPLATES = {
+    # MLCouplingData is a composite object, cast directly from void* without type tag dispatch
+    'data': ('*reinterpret_cast<{t}*>(parameter.at("{n}").second)',
+             '"{n}=" << ({a})'),
+    # Pointers to known classes (e.g. MLCouplingNormalization<In,Out>*): the config already
+    # stores the raw object pointer in parameter.second
+    'class_pointer': ('reinterpret_cast<{t}>(parameter.at("{n}").second)',
+                      '"{n}=" << {a}'),
+    # Types config_param_cast supports, optionally falling back to the default
+    'cast': ('config_param_cast<{t}>(parameter.at("{n}"))',
+             '"{n}=" << {a}'),
+    'cast_default': ('parameter.find("{n}") != parameter.end() ? config_param_cast<{t}>(parameter.at("{n}")) : ({t}){d}',
+                     '"{n}=" << ({a})'),
+    # Opaque/non-primitive parameters are passed via a typed pointer
+    'opaque': ('*reinterpret_cast<{t}*>(parameter.at("{n}").second)',
+               '"{n}=<provided>"'),
+    'opaque_default': ('parameter.find("{n}") != parameter.end() ? *reinterpret_cast<{t}*>(parameter.at("{n}").second) : ({t}){d}',
+                       '"{n}=<" << (parameter.find("{n}") != parameter.end() ? "provided" : "default") << ">"'),
+}
+
+
+def _param_extraction(param_type, param_name, param_default):
+    """Return the (argument, debug output) C++ snippets that read one constructor parameter."""
+    cast_type = _strip_cvref(param_type)
+    if _is_mlcoupling_data_type(param_type):
+        kind = 'data'
+    elif _is_pointer_to_known_class(param_type):
+        kind, cast_type = 'class_pointer', param_type
+    elif _can_use_config_param_cast(param_type):
+        kind = 'cast_default' if param_default else 'cast'
+    else:
+        kind = 'opaque_default' if param_default else 'opaque'
+
+    arg_template, debug_template = _PARAM_EXTRACTION_TEMPLATES[kind]
+    arg = arg_template.format(t=cast_type, n=param_name, d=param_default)
+    return arg, debug_template.format(n=param_name, a=arg)
+
+
+@functools.lru_cache(maxsize=None)
+def _ctor_branch_parts(ctor):
+    """Return the (param docs, size check, argument list, debug output) snippets of a constructor branch.
+    Subclasses of one base often share signatures, so each is formatted once.
+    """
+    param_count = len(ctor)
+    params_with_defaults = sum(1 for param in ctor if param.default is not None)
+    params_without_defaults = param_count - params_with_defaults
+
+    param_docs = [f"{_normalize_type_for_display(p.type)} {p.name} = {p.default}" if p.default else f"{_normalize_type_for_display(p.type)} {p.name}" for p in ctor]
+
+    if params_with_defaults > 0:
+        size_check = f'parameter.size() >= {params_without_defaults} && parameter.size() <= {param_count}'
+    else:
+        size_check = f'parameter.size() == {param_count}'
+
+    # Generate parameter extraction code using config_param_cast
+    param_args = []
+    debug_outputs = []
+    for ptype, pname, pdefault in ctor:
+        param_arg, debug_output = _param_extraction(ptype, pname, pdefault)
+        param_args.append(param_arg)
+        debug_outputs.append(debug_output)
+
+    # Debug output with proper << chaining, the class name is prepended per branch
+    debug_args = ''.join(" << " + ("\", \"" if idx > 0 else "") + debug_out
+                         for idx, debug_out in enumerate(debug_outputs))
+    return ", ".join(param_docs), size_check, ', '.join(param_args), debug_args
+
+
+# One constructor overload inside a create_instance_* class branch
+_MAP_FACTORY_CTOR_TEMPLATE = """\
+        // Constructor with {param_count} parameter(s)
+        // Parameters: {param_docs}
+        if ({size_check}) {{
+            try {{
+                {debug_line}
+                return new {cls_inst}({params_str});
+            }} catch (...) {{
+                // Handle exceptions if necessary
+            }}
+        }}
+"""
+
+# Default constructors read no parameters, but a throwing constructor still yields nullptr
+# like every other branch
+_MAP_FACTORY_DEFAULT_CTOR_TEMPLATE = """\
+        // Default constructor
+        if (parameter.empty()) {{
+            try {{
+                {debug_line}
+                return new {cls_inst}();
+            }} catch (...) {{
+                // Handle exceptions if necessary
+            }}
+        }}
+"""
+
 
 def _write_map_factory(f, base_class, template_str, template_args, category,
-                       base_template_params, entries, subclass_constructors):
+                       base_template_params, entries):
     """Generate unordered_map<string, pair<int,void*>> parameter factory with name resolution."""
-    f.write(f"{template_str} create_instance_{base_class.lower()}(const std::string &class_name, const std::unordered_map<std::string, std::pair<int, void*>>& parameter) {{\n")
-    f.write(f"    // Resolve name or alias to actual class name\n")
-    f.write(f"    std::string resolved_class_name = resolve_{category}_class_name(class_name);\n\n")
-    
-    for i, (cls, _, subclass_template_params) in enumerate(entries):
-        if i == 0:
-            f.write(f'    if (resolved_class_name == "{cls}") {{\n')
-        else:
-            f.write(f'    }} else if (resolved_class_name == "{cls}") {{\n')
+    out = []
+    out.append(f"{template_str} create_instance_{base_class.lower()}(const std::string &class_name, const std::unordered_map<std::string, std::pair<int, void*>>& parameter) {{\n")
+    out.append(f"    // Resolve name or alias to actual class name\n")
+    out.append(f"    std::string resolved_class_name = resolve_{category}_class_name(class_name);\n\n")
+
+    # Map the name to a branch index once, then jump straight to that class's constructors
+    indices = {}
+    for entry in entries:
+        indices.setdefault(entry.name, len(indices))
+    if indices:
+        out.append("    int class_index = -1;\n")
+        _write_length_switch(out, "resolved_class_name", indices.items(),
+                             lambda index: f"{{ class_index = {index}; break; }}")
+        out.append("\n    switch (class_index) {\n")
+
+    written = set()
+    for entry in entries:
+        cls = entry.name
+        if cls in written:
+            continue  # Duplicate name, only the first entry is reachable
+        written.add(cls)
+        out.append(f"        case {indices[cls]}: {{ // {cls}\n")
+        block = []
         
-        cls_inst = _get_class_instantiation(cls, subclass_template_params, base_template_params)
+        cls_inst = _get_class_instantiation(cls, entry.template_params, base_template_params)
         
-        for ctor in subclass_constructors[base_class].get(cls, []):
-            param_count = len(ctor)
-            params_with_defaults = sum(1 for _, _, d in ctor if d is not None)
-            params_without_defaults = param_count - params_with_defaults
-            
-            param_docs = [f"{_normalize_type_for_display(t)} {n} = {d}" if d else f"{_normalize_type_for_display(t)} {n}" for t, n, d in ctor]
-            
-            f.write(f'        // Constructor with {param_count} parameter(s)\n')
-            f.write(f'        // Parameters: {", ".join(param_docs)}\n')
-            
-            if params_with_defaults > 0:
-                f.write(f'        if (parameter.size() >= {params_without_defaults} && parameter.size() <= {param_count}) {{\n')
-            else:
-                f.write(f'        if (parameter.size() == {param_count}) {{\n')
-            
-            f.write(f'            try {{\n')
-            
-            # Generate parameter extraction code using config_param_cast
-            param_args = []
-            debug_outputs = []
-            for ptype, pname, pdefault in ctor:
-                storage_type = _strip_cvref(ptype)
-                if _is_mlcoupling_data_type(ptype):
-                    # For MLCouplingData, cast directly from void* (composite object, no type tag dispatch)
-                    param_args.append(f'*reinterpret_cast<{storage_type}*>(parameter.at("{pname}").second)')
-                    debug_outputs.append(f'"{pname}=" << (*reinterpret_cast<{storage_type}*>(parameter.at("{pname}").second))')
-                elif _is_pointer_to_known_class(ptype):
-                    # For pointers to known classes (e.g. MLCouplingNormalization<In,Out>*),
-                    # the config already stores the raw object pointer in parameter.second.
-                    param_args.append(f'reinterpret_cast<{ptype}>(parameter.at("{pname}").second)')
-                    debug_outputs.append(f'"{pname}=" << reinterpret_cast<{ptype}>(parameter.at("{pname}").second)')
-                elif _can_use_config_param_cast(ptype):
-                    cast_type = storage_type
-                    if pdefault:
-                        # Parameter with default: check if present, use config_param_cast or default
-                        param_args.append(f'parameter.find("{pname}") != parameter.end() ? config_param_cast<{cast_type}>(parameter.at("{pname}")) : ({cast_type}){pdefault}')
-                        debug_outputs.append(f'"{pname}=" << (parameter.find("{pname}") != parameter.end() ? config_param_cast<{cast_type}>(parameter.at("{pname}")) : ({cast_type}){pdefault})')
-                    else:
-                        # Required parameter: use config_param_cast
-                        param_args.append(f'config_param_cast<{cast_type}>(parameter.at("{pname}"))')
-                        debug_outputs.append(f'"{pname}=" << config_param_cast<{cast_type}>(parameter.at("{pname}"))')
-                elif pdefault:
-                    # Opaque/non-primitive parameter with default: pass via typed pointer, fallback to default expression
-                    param_args.append(f'parameter.find("{pname}") != parameter.end() ? *reinterpret_cast<{storage_type}*>(parameter.at("{pname}").second) : ({storage_type}){pdefault}')
-                    debug_outputs.append(f'"{pname}=<" << (parameter.find("{pname}") != parameter.end() ? "provided" : "default") << ">"')
-                else:
-                    # Opaque/non-primitive required parameter: pass via typed pointer
-                    param_args.append(f'*reinterpret_cast<{storage_type}*>(parameter.at("{pname}").second)')
-                    debug_outputs.append(f'"{pname}=<provided>"')
-            
-            params_str = ', '.join(param_args)
-            
-            # Build debug output statement with proper << chaining
-            debug_line = 'std::cout << "Creating instance of ' + cls + ' with parameters: "'
-            for idx, debug_out in enumerate(debug_outputs):
-                debug_line += " << " + ("\", \"" if idx > 0 else "") + debug_out
-            debug_line += ' << std::endl;'
-            
-            f.write(f'                {debug_line}\n')
-            f.write(f'                return new {cls_inst}({params_str});\n')
-            f.write(f'            }} catch (...) {{\n')
-            f.write(f'                // Handle exceptions if necessary\n')
-            f.write(f'            }}\n')
-            f.write(f'        }}\n')
+        emitted = set()
+        for ctor in entry.constructors:
+            # Identical signatures would produce identical, unreachable branches
+            signature = tuple(ctor)
+            if signature in emitted:
+                continue
+            emitted.add(signature)
+
+            if not ctor:
+                block.append(_MAP_FACTORY_DEFAULT_CTOR_TEMPLATE.format(
+                    debug_line=f'std::cout << "Creating instance of {cls} with parameters: " << std::endl;',
+                    cls_inst=cls_inst,
+                ))
+                continue
+
+            param_docs, size_check, params_str, debug_args = _ctor_branch_parts(signature)
+            debug_line = ('std::cout << "Creating instance of ' + cls + ' with parameters: "'
+                          + debug_args + ' << std::endl;')
+
+            block.append(_MAP_FACTORY_CTOR_TEMPLATE.format(
+                param_count=len(ctor),
+                param_docs=param_docs,
+                size_check=size_check,
+                debug_line=debug_line,
+                cls_inst=cls_inst,
+                params_str=params_str,
+            ))
         
-        f.write(f'        return nullptr;\n')
-    
-    if entries:
-        f.write("    }\n")
-    
-    f.write("    return nullptr;\n}\n\n")
+        block.append(f'        return nullptr;\n')
+        out.append(textwrap.indent(''.join(block), '    '))
+        out.append("        }\n")
+
+    if indices:
+        out.append("    }\n")
+
+    out.append("    return nullptr;\n}\n\n")
+
+    f.write(''.join(out))
+
+
+# =============================================================================
+# Header Result Cache
+# =============================================================================
+
+CACHE_FORMAT_VERSION = 2
+
+
+def get_cache_dir():
+    """Get the on-disk cache directory from environment or the working directory.
+    The output usually sits in the scanned include tree, so the cache is not placed next
+    to it. Setting REGISTRY_CACHE_DIR to an empty string disables caching.
+    """
+    env_dir = os.environ.get('REGISTRY_CACHE_DIR')
+    if env_dir is not None:
+        return env_dir or None
+    return os.path.join(os.getcwd(), '.cache', 'registry_gen')
+
+
+def _file_digest(path):
+    """Return the SHA-256 hex digest of a file's contents, or None if unreadable."""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _libclang_version():
+    """Identify the libclang build in use so cache entries do not outlive it."""
+    parts = []
+    for dist in ('libclang', 'clang'):
+        try:
+            parts.append(f"{dist}={importlib.metadata.version(dist)}")
+        except importlib.metadata.PackageNotFoundError:
+            pass
+    try:
+        parts.append(clang.cindex.conf.get_filename()) # type: ignore
+    except Exception:
+        pass
+    return ';'.join(parts)
+
+
+def generator_cache_digest():
+    """
+    Digest of everything besides the header and parse configuration that results depend on:
+    the cache format, the generator's own source and the libclang build. Computed once
+    per run and passed to header_cache_key.
+    """
+    h = hashlib.sha256()
+    # The generator's own digest covers changes to parse options and extraction logic
+    for part in (str(CACHE_FORMAT_VERSION), _file_digest(os.path.abspath(__file__)) or '',
+                 _libclang_version()):
+        h.update(part.encode())
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def header_cache_key(header_path, base_classes, parse_args, generator_digest=None):
+    """Build the cache key for a header from its path, contents and the parse configuration.
+    generator_digest is the run's generator_cache_digest(), computed here if not given.
+    """
+    digest = _file_digest(header_path)
+    if digest is None:
+        return None
+    if generator_digest is None:
+        generator_digest = generator_cache_digest()
+    h = hashlib.sha256()
+    for part in (generator_digest, header_path, digest, repr(list(base_classes)), repr(list(parse_args))):
+        h.update(part.encode())
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def load_cached_header_result(cache_dir, key):
+    """Return the cached result for key, or None on miss or if any included file changed."""
+    try:
+        with open(os.path.join(cache_dir, f"{key}.pkl"), 'rb') as f:
+            entry = pickle.load(f)
+    except Exception:
+        return None
+
+    for path, digest in entry['dependencies'].items():
+        if _file_digest(path) != digest:
+            return None
+    return entry['result']
+
+
+def store_cached_header_result(cache_dir, key, result, dependencies):
+    """Persist a header result together with the digests of the files it included."""
+    entry = {
+        'result': result,
+        'dependencies': {path: _file_digest(path) for path in dependencies},
+    }
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = os.path.join(cache_dir, f"{key}.pkl.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, os.path.join(cache_dir, f"{key}.pkl"))
+    except OSError as e:
+        print(f"Warning: could not write registry cache entry: {e}")
+
+
+# =============================================================================
+# Parallel Parsing
+# =============================================================================
+
+_WORKER_INDEX = None
+
+
+def get_worker_count():
+    """Get the number of parser processes from environment or use all cores."""
+    env_jobs = os.environ.get('REGISTRY_JOBS')
+    if env_jobs:
+        try:
+            return max(1, int(env_jobs))
+        except ValueError:
+            pass
+    return os.cpu_count() or 1
+
+
+def _init_worker():
+    """Create one libclang index per worker process."""
+    global _WORKER_INDEX
+    _WORKER_INDEX = init_libclang()
+
+
+def _process_header_job(job):
+    """Parse one header in a worker, capturing its log output for the parent to print in order."""
+    h, base_classes, parse_args = job
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        result, dependencies = process_header(_WORKER_INDEX, h, base_classes, parse_args)
+    return result, dependencies, output.getvalue()
+
+
+def parse_headers(index, jobs):
+    """
+    Run process_header for each (header, base_classes, parse_args) job, spreading
+    the jobs over a process pool when there is more than one.
+    Yields: (result, dependencies) in job order.
+    """
+    workers = min(get_worker_count(), len(jobs))
+    if workers <= 1:
+        for h, base_classes, parse_args in jobs:
+            log("Parsing:", h)
+            yield process_header(index, h, base_classes, parse_args)
+        return
+
+    with multiprocessing.Pool(workers, initializer=_init_worker) as pool:
+        for job, (result, dependencies, output) in zip(jobs, pool.imap(_process_header_job, jobs)):
+            log("Parsing:", job[0])
+            print(output, end='')
+            yield result, dependencies
 
 
 # =============================================================================
 # Main Entry Point
 # =============================================================================
 
+def empty_header_result(base_classes):
+    """Return the process_header result of a header that contributes nothing."""
+    return {
+        'base_classes_found': {},
+        'template_parameters': {},
+        'base_class_categories': {},
+        'found_classes': {bc: [] for bc in base_classes},
+    }
+
+
+def header_may_contribute(header_path, base_classes):
+    """
+    Cheap text check run before parsing. A header can only declare a base class or one of
+    its subclasses if it names a base class, or declares a class with a base clause that
+    may reach a base class through an intermediate class. Errs on the side of True.
+    """
+    try:
+        text = read_header_text(header_path)
+    except (OSError, ValueError):
+        # Unreadable or not valid text (UnicodeDecodeError), leave the decision to the parser
+        return True
+    return any(bc in text for bc in base_classes) or _RE_DERIVED_CLASS_HEAD.search(text) is not None
+
+
+def process_header(index, h, base_classes, parse_args):
+    """
+    Parse one header and collect the registry data it contributes.
+    Returns: (result, dependencies) where result is a plain, picklable dict and
+    dependencies lists every file included by the translation unit.
+    """
+    result = empty_header_result(base_classes)
+
+    tu = index.parse(h, args=parse_args, options=get_parse_options())
+    clear_inheritance_cache()
+    base_class_set = frozenset(base_classes)
+    for node, node_file in iter_class_declarations(tu.cursor, h):
+        # Classify the node against all base classes at once
+        name = node.spelling
+        children = collect_class_children(node)
+        declared = _matching_base_names(name, base_class_set)
+        inherited = get_inherited_base_names(node, base_class_set, children=children)
+        abstract = None
+        subclass_info = None
+
+        for base_class in base_classes:
+            if base_class in declared:
+                is_base, base_template_params = is_base_class_declaration(node, base_class, h, node_file, children)
+                if is_base:
+                    log(f"File {h} contains class {base_class}")
+                    result['base_classes_found'][base_class] = h
+                    result['template_parameters'][base_class] = base_template_params
+                    
+                    # Extract category metadata for base class
+                    base_metadata = get_class_metadata(node, h)
+                    if 'category' in base_metadata:
+                        result['base_class_categories'][base_class] = base_metadata['category']
+                        log(f"    Base class category: {base_metadata['category']}")
+                    
+                    continue
+            
+            is_sub = base_class in inherited
+            # Fallback to text-based check if AST didn't expose base specifier
+            if not is_sub and name:
+                is_sub = text_inherits(h, name, base_class)
+
+            if not (is_sub and name and name != base_class):
+                continue
+            if abstract is None:
+                abstract = is_effectively_abstract(node, h)
+            if abstract:
+                continue
+
+            # Subclass details do not depend on the base class, extract them once
+            if subclass_info is None:
+                # Get template parameters for this subclass
+                subclass_template_params = get_template_parameters(node, children)
+                if subclass_template_params:
+                    log(f"    Subclass {name} template parameters: {subclass_template_params}")
+                
+                # Get metadata for this subclass
+                metadata = get_class_metadata(node, h)
+                if metadata:
+                    if 'registry_name' in metadata:
+                        log(f"    Registry name: {metadata['registry_name']}")
+                    if 'aliases' in metadata:
+                        log(f"    Aliases: {', '.join(metadata['aliases'])}")
+                
+                # Get constructors for this subclass
+                subclass_constructors_list = get_class_constructors(node, name, node_file or None, children)
+                subclass_info = (subclass_template_params, metadata, subclass_constructors_list)
+
+            subclass_template_params, metadata, subclass_constructors_list = subclass_info
+            
+            # Stored as plain tuples so results unpickle without this module's classes
+            result['found_classes'][base_class].append(
+                (name, h, subclass_template_params,
+                 [[tuple(param) for param in ctor] for ctor in subclass_constructors_list], metadata))
+
+    dependencies = sorted({str(inc.include.name) for inc in tu.get_includes() if inc.include})
+    # The memo holds cursors, which keep the translation unit alive
+    clear_inheritance_cache()
+    return result, dependencies
+
+
 def generate():
-    if len(sys.argv) < 4:
-        print("Usage: generate_registry.py <output_path> <base_classes> <header_files...>")
+    argv = sys.argv[1:]
+    if '--verbose' in argv:
+        argv = [arg for arg in argv if arg != '--verbose']
+        set_verbose(True)
+
+    if len(argv) < 3:
+        print("Usage: generate_registry.py [--verbose] <output_path> <base_classes> <header_files...>")
         sys.exit(1)
     
-    output_path = sys.argv[1]
-    base_class = sys.argv[2]
-    headers = sys.argv[3:]
+    output_path = argv[0]
+    base_class = argv[1]
+    headers = argv[2:]
     
     base_classes = base_class.split(",") if "," in base_class else [base_class]
 
     # Initialize libclang
     index = init_libclang()
     parse_args = get_parse_args()
+    cache_dir = get_cache_dir()
+    generator_digest = generator_cache_digest() if cache_dir else None
     
     # Data structures
     found_classes = {bc: [] for bc in base_classes}
     base_classes_found = {}
-    subclass_constructors = {bc: {} for bc in base_classes}
     template_parameters = {bc: [] for bc in base_classes}
-    class_metadata = {bc: {} for bc in base_classes}
     base_class_categories = {}
 
-    print("Header files to scan:", headers)
-    
-    for h in headers:
-        print("Parsing:", h)
-        tu = index.parse(h, args=parse_args)
-        for node in tu.cursor.walk_preorder():
-            if node.kind not in (clang.cindex.CursorKind.CLASS_DECL, # type: ignore
-                                 clang.cindex.CursorKind.STRUCT_DECL, # type: ignore
-                                 clang.cindex.CursorKind.CLASS_TEMPLATE): # type: ignore
-                continue
-            
-            for base_class in base_classes:
-                is_base, base_template_params = is_base_class_declaration(node, base_class, h)
-                if is_base:
-                    print(f"File {h} contains class {base_class}")
-                    base_classes_found[base_class] = h
-                    template_parameters[base_class] = base_template_params
-                    
-                    # Extract category metadata for base class
-                    base_metadata = get_class_metadata(node, h)
-                    if 'category' in base_metadata:
-                        base_class_categories[base_class] = base_metadata['category']
-                        print(f"    Base class category: {base_metadata['category']}")
-                    
-                    continue
-                
-                is_sub = is_subclass_of(node, base_class)
-                # Fallback to text-based check if AST didn't expose base specifier
-                if not is_sub and node.spelling:
-                    is_sub = text_inherits(h, node.spelling, base_class)
-
-                if is_sub and node.spelling and not is_effectively_abstract(node, h):
-                    if node.spelling != base_class:
-                        # Only process classes defined in the current header file (not included files)
-                        node_file = str(node.location.file) if node.location.file else ""
-                        if not (node_file.endswith(h) or h.endswith(node_file)):
-                            continue
-                        
-                        # Get template parameters for this subclass
-                        subclass_template_params = get_template_parameters(node)
-                        if subclass_template_params:
-                            print(f"    Subclass {node.spelling} template parameters: {subclass_template_params}")
-                        
-                        # Get metadata for this subclass
-                        metadata = get_class_metadata(node, h)
-                        if metadata:
-                            class_metadata[base_class][node.spelling] = metadata
-                            if 'registry_name' in metadata:
-                                print(f"    Registry name: {metadata['registry_name']}")
-                            if 'aliases' in metadata:
-                                print(f"    Aliases: {', '.join(metadata['aliases'])}")
-                        
-                        # Get constructors for this subclass
-                        subclass_constructors_list = get_class_constructors(node, node.spelling)
-                        subclass_constructors[base_class][node.spelling] = subclass_constructors_list
-                        
-                        # Store subclass with template info
-                        found_classes[base_class].append((node.spelling, h, subclass_template_params))
-
-    # Write output file
-    with open(output_path, "w") as f:
-        write_includes(f, base_classes, base_classes_found, found_classes)
-        write_lookup_functions(f, base_classes, base_class_categories, found_classes, class_metadata)
-        write_combined_lookup_function(f, set(base_class_categories.get(bc, bc.lower()) for bc in base_classes))
-        write_category_lookup(f, base_classes, base_class_categories)
-        write_constructor_dependencies(f, base_classes, found_classes, subclass_constructors)
-        write_constructor_signatures(f, base_classes, found_classes, subclass_constructors)
-        write_print_constructor_help(f)
-        write_class_hierarchy_functions(f, base_classes, found_classes)
-        write_type_identification_functions(f, base_classes, template_parameters, found_classes)
-        write_config_param_cast_helper(f)
-        write_factory_functions(f, base_classes, template_parameters, base_class_categories,
-                                found_classes, subclass_constructors)
+    log("Header files to scan:", headers)
+
+    # Look up every header in the cache first so only the misses are parsed
+    results = [None] * len(headers)
+    misses = []
+    for i, h in enumerate(headers):
+        if not header_may_contribute(h, base_classes):
+            log("Skipped (no candidate classes):", h)
+            results[i] = empty_header_result(base_classes)
+            continue
+        key = header_cache_key(h, base_classes, parse_args, generator_digest) if cache_dir else None
+        results[i] = load_cached_header_result(cache_dir, key) if key else None
+        if results[i] is not None:
+            log("Cached:", h)
+        else:
+            misses.append((i, key))
+
+    if misses:
+        pch_tmp_dir = None
+        if cache_dir:
+            pch_dir = cache_dir
+        else:
+            pch_tmp_dir = tempfile.TemporaryDirectory()
+            pch_dir = pch_tmp_dir.name
+        base_headers = find_base_class_headers(headers, base_classes)
+        pch_path, pch_dependencies = build_preamble_pch(index, base_headers, parse_args, pch_dir)
+
+        # Headers inside the preamble, including those a base header pulls in, are parsed
+        # plainly: with the PCH their declarations would not come from the main file
+        preamble_files = {_canonical_path(path) for path in pch_dependencies}
+        preamble_files.update(_canonical_path(h) for h in base_headers)
+        jobs = []
+        for i, _ in misses:
+            header_args = parse_args
+            if pch_path and _canonical_path(headers[i]) not in preamble_files:
+                header_args = parse_args + ['-include-pch', pch_path]
+            jobs.append((headers[i], base_classes, header_args))
+
+        for (i, key), (result, dependencies) in zip(misses, parse_headers(index, jobs)):
+            results[i] = result
+            if key:
+                store_cached_header_result(cache_dir, key, result,
+                                           sorted(set(dependencies) | set(pch_dependencies)))
+
+        if pch_tmp_dir is not None:
+            pch_tmp_dir.cleanup()
+
+    # Merge in header order so later headers win, as in a single pass
+    for result in results:
+        base_classes_found.update(result['base_classes_found'])
+        template_parameters.update(result['template_parameters'])
+        base_class_categories.update(result['base_class_categories'])
+        for bc in base_classes:
+            found_classes[bc].extend(SubclassEntry.from_result(entry) for entry in result['found_classes'][bc])
+
+    clear_header_caches()
+
+    # Every writer but write_includes skips entries that are themselves base classes
+    base_class_set = frozenset(base_classes)
+    subclass_entries = {bc: [entry for entry in found_classes[bc] if entry.name not in base_class_set]
+                        for bc in base_classes}
+
+    # Registry names and aliases, expanded once for the lookup functions
+    lookup_pairs = {}
+    for bc in base_classes:
+        pairs = lookup_pairs[bc] = []
+        for entry in subclass_entries[bc]:
+            metadata = entry.metadata
+            if 'registry_name' in metadata:
+                pairs.append((metadata['registry_name'], entry.name))
+            pairs.extend((alias, entry.name) for alias in metadata.get('aliases', ()))
+
+    # Generate into memory and write the output file in one go
+    f = io.StringIO()
+    write_includes(f, base_classes, base_classes_found, found_classes)
+    write_lookup_functions(f, base_classes, base_class_categories, lookup_pairs)
+    # Keep the categories in base class order so repeated runs emit identical output
+    categories = list(dict.fromkeys(base_class_categories.get(bc, bc.lower()) for bc in base_classes))
+    write_combined_lookup_function(f, categories)
+    write_category_lookup(f, base_classes, base_class_categories)
+    write_constructor_dependencies(f, base_classes, subclass_entries)
+    write_constructor_signatures(f, base_classes, subclass_entries)
+    write_print_constructor_help(f)
+    write_class_hierarchy_functions(f, base_classes, subclass_entries)
+    write_type_identification_functions(f, base_classes, template_parameters, subclass_entries)
+    write_config_param_cast_helper(f)
+    write_factory_functions(f, base_classes, template_parameters, base_class_categories,
+                            subclass_entries)
+
+    # Encode once and write bytes, so the output is UTF-8 regardless of the locale
+    content = f.getvalue().encode('utf-8')
+
+    # Leave an up-to-date output untouched so its timestamp does not trigger rebuilds
+    try:
+        with open(output_path, "rb") as existing:
+            if existing.read() == content:
+                log("Output unchanged:", output_path)
+                return
+    except OSError:
+        pass
+
+    # Replace the file in one step so a concurrent build never sees a partial header.
+    # The temporary name is per process, so concurrent runs never replace each other's.
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as out:
+            out.write(content)
+        os.replace(tmp_path, output_path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+        raise
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+import importlib.util
+import os
+import pathlib
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+
+_module_path = pathlib.Path(__file__).resolve().with_name("generate_registry.py")
+_spec = importlib.util.spec_from_file_location("generate_registry", _module_path)
+generate_registry = importlib.util.module_from_spec(_spec) # type: ignore
+assert _spec and _spec.loader
+_spec.loader.exec_module(generate_registry)
+
+
+class TestHeaderResultCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_dir = pathlib.Path(self._tmp.name)
+        self.cache_dir = str(self.tmp_dir / "cache")
+        self.header = self.tmp_dir / "header.hpp"
+        self.header.write_text("class Foo {};\n")
+        self.dependency = self.tmp_dir / "dependency.hpp"
+        self.dependency.write_text("class Base {};\n")
+        self.result = {"found_classes": {"Base": [("Foo", str(self.header), [])]}}
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _key(self, base_classes=("Base",), parse_args=("-std=c++17",)):
+        return generate_registry.header_cache_key(str(self.header), base_classes, parse_args)
+
+    def test_round_trip(self):
+        key = self._key()
+        self.assertIsNone(generate_registry.load_cached_header_result(self.cache_dir, key))
+        generate_registry.store_cached_header_result(self.cache_dir, key, self.result, [str(self.dependency)])
+        self.assertEqual(generate_registry.load_cached_header_result(self.cache_dir, key), self.result)
+
+    def test_key_depends_on_contents_and_configuration(self):
+        key = self._key()
+        self.assertNotEqual(key, self._key(base_classes=("Base", "Other")))
+        self.assertNotEqual(key, self._key(parse_args=("-std=c++20",)))
+        self.assertEqual(key, generate_registry.header_cache_key(
+            str(self.header), ("Base",), ("-std=c++17",), generate_registry.generator_cache_digest()))
+        self.assertNotEqual(key, generate_registry.header_cache_key(
+            str(self.header), ("Base",), ("-std=c++17",), "other-generator"))
+        self.header.write_text("class Foo : public Base {};\n")
+        self.assertNotEqual(key, self._key())
+
+    def test_changed_dependency_invalidates_entry(self):
+        key = self._key()
+        generate_registry.store_cached_header_result(self.cache_dir, key, self.result, [str(self.dependency)])
+        self.dependency.write_text("class Base { virtual void f() = 0; };\n")
+        self.assertIsNone(generate_registry.load_cached_header_result(self.cache_dir, key))
+
+
+BASE_HEADER = """\
+#pragma once
+
+class Base {
+public:
+    virtual ~Base() = default;
+    virtual void run() = 0;
+};
+
+#include "default_impl.hpp"
+"""
+
+DEFAULT_IMPL_HEADER = """\
+#pragma once
+#include "base.hpp"
+
+class DefaultImpl : public Base {
+public:
+    DefaultImpl(int);
+    void run() override {}
+};
+"""
+
+
+class TestPreambleHeaders(unittest.TestCase):
+    def setUp(self):
+        try:
+            import clang.cindex  # noqa: F401
+        except ModuleNotFoundError:
+            self.skipTest("clang.cindex is not available in this Python environment")
+
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp_dir = pathlib.Path(self._tmp.name)
+        (self.tmp_dir / "base.hpp").write_text(BASE_HEADER)
+        (self.tmp_dir / "default_impl.hpp").write_text(DEFAULT_IMPL_HEADER)
+        self.output = self.tmp_dir / "registry.hpp"
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_header_included_by_base_header_is_registered(self):
+        argv = ["generate_registry.py", str(self.output), "Base",
+                str(self.tmp_dir / "base.hpp"), str(self.tmp_dir / "default_impl.hpp")]
+        env = {"REGISTRY_CACHE_DIR": str(self.tmp_dir / "cache"), "REGISTRY_JOBS": "1"}
+        with mock.patch.object(sys, "argv", argv), mock.patch.dict(os.environ, env):
+            generate_registry.generate()
+        self.assertIn("return new DefaultImpl(", self.output.read_text())
+
+
+if __name__ == "__main__":
+    unittest.main()
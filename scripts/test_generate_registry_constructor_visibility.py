@@ -1,5 +1,6 @@
 import importlib.util
 import pathlib
+import tempfile
 import unittest
 
 
@@ -22,8 +23,8 @@ class TestConstructorVisibility(unittest.TestCase):
         self.repo_root = pathlib.Path(__file__).resolve().parents[1]
         self.parse_args = ['-std=c++17', '-I.', '-Iinclude', '-xc++']
 
-    def _find_class_node(self, header_rel_path: str, class_name: str):
-        header_path = self.repo_root / header_rel_path
+    def _find_class_node(self, header_rel_path: str, class_name: str, root=None):
+        header_path = (root or self.repo_root) / header_rel_path
         index = self.cindex.Index.create()
         tu = index.parse(str(header_path), args=self.parse_args)
 
@@ -62,6 +63,32 @@ class TestConstructorVisibility(unittest.TestCase):
         self.assertNotIn("hosts", public_ctor_param_names)
         self.assertNotIn("ports", public_ctor_param_names)
 
+    def test_deleted_ctor_not_exposed(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = pathlib.Path(tmp)
+            (root / "header.hpp").write_text(
+                "class Pinned {\n"
+                "public:\n"
+                "    Pinned(const Pinned&) = delete;\n"
+                "    Pinned(int value) {}\n"
+                "};\n"
+                "class NoDefault {\n"
+                "public:\n"
+                "    NoDefault(NoDefault&&) = delete;\n"
+                "};\n"
+            )
+            generate_registry.clear_header_caches()
+            pinned = self._find_class_node("header.hpp", "Pinned", root)
+            no_default = self._find_class_node("header.hpp", "NoDefault", root)
+
+            self.assertEqual(
+                generate_registry.get_class_constructors(pinned, "Pinned"),
+                [[("int", "value", None)]],
+            )
+            # The deleted constructor also suppresses the implicit default constructor
+            self.assertEqual(generate_registry.get_class_constructors(no_default, "NoDefault"), [])
+            generate_registry.clear_header_caches()
+
 
 if __name__ == "__main__":
     unittest.main()
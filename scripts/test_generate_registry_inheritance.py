@@ -0,0 +1,92 @@
+import importlib.util
+import pathlib
+import tempfile
+import unittest
+
+
+_module_path = pathlib.Path(__file__).resolve().with_name("generate_registry.py")
+_spec = importlib.util.spec_from_file_location("generate_registry", _module_path)
+generate_registry = importlib.util.module_from_spec(_spec) # type: ignore
+assert _spec and _spec.loader
+_spec.loader.exec_module(generate_registry)
+
+
+HEADER = """\
+#pragma once
+
+class Forward;
+
+template <typename In, typename Out>
+class Wrapped : public ns::Base<In, Out>, private Mixin {
+};
+
+template <>
+class Special<std::map<int, ns::Key>> final : virtual public Holder<Base<int, int>, Other> {
+};
+
+template <class T> class Foo : public Base<T> {};
+"""
+
+
+class TestInheritanceIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.header = str(pathlib.Path(self._tmp.name) / "header.hpp")
+        pathlib.Path(self.header).write_text(HEADER)
+        generate_registry.clear_header_caches()
+
+    def tearDown(self):
+        generate_registry.clear_header_caches()
+        self._tmp.cleanup()
+
+    def test_direct_bases_are_unqualified_names(self):
+        index = generate_registry.build_inheritance_index(self.header)
+        self.assertEqual(index["Wrapped"], {"Base", "Mixin"})
+
+    def test_template_arguments_are_not_bases(self):
+        self.assertTrue(generate_registry.text_inherits(self.header, "Special", "Holder"))
+        self.assertFalse(generate_registry.text_inherits(self.header, "Special", "Base"))
+        self.assertFalse(generate_registry.text_inherits(self.header, "Special", "Key"))
+
+    def test_class_template_parameters_are_not_class_heads(self):
+        self.assertTrue(generate_registry.text_inherits(self.header, "Foo", "Base"))
+        self.assertNotIn("T", generate_registry.build_inheritance_index(self.header))
+
+    def test_unknown_class_or_missing_header(self):
+        self.assertFalse(generate_registry.text_inherits(self.header, "Forward", "Base"))
+        self.assertFalse(generate_registry.text_inherits(self.header + ".missing", "Wrapped", "Base"))
+
+
+class TestHeaderPrefilter(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.header = pathlib.Path(self._tmp.name) / "header.hpp"
+        generate_registry.clear_header_caches()
+
+    def tearDown(self):
+        generate_registry.clear_header_caches()
+        self._tmp.cleanup()
+
+    def _may_contribute(self, text):
+        generate_registry.clear_header_caches()
+        self.header.write_text(text)
+        return generate_registry.header_may_contribute(str(self.header), ["Base"])
+
+    def test_headers_without_candidates_are_skipped(self):
+        self.assertFalse(self._may_contribute("#pragma once\nstruct Plain { int a; };\nclass Forward;\n"))
+        self.assertFalse(self._may_contribute("enum Mode { A, B };\nusing It = std::vector<int>::iterator;\n"))
+
+    def test_named_base_or_any_base_clause_is_kept(self):
+        self.assertTrue(self._may_contribute("class Base {};\n"))
+        self.assertTrue(self._may_contribute("class Derived final\n    : public Intermediate<int> {};\n"))
+        self.assertTrue(self._may_contribute("struct outer::Inner : Other {};\n"))
+        self.assertTrue(generate_registry.header_may_contribute(str(self.header) + ".missing", ["Base"]))
+
+    def test_undecodable_header_is_kept(self):
+        generate_registry.clear_header_caches()
+        self.header.write_bytes(b"// Caf\xe9\nclass Derived : public Base {};\n")
+        self.assertTrue(generate_registry.header_may_contribute(str(self.header), ["Base"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import importlib.util
+import pathlib
+import tempfile
+import unittest
+
+
+_module_path = pathlib.Path(__file__).resolve().with_name("generate_registry.py")
+_spec = importlib.util.spec_from_file_location("generate_registry", _module_path)
+generate_registry = importlib.util.module_from_spec(_spec) # type: ignore
+assert _spec and _spec.loader
+_spec.loader.exec_module(generate_registry)
+
+
+HEADER = """\
+#pragma once
+
+// @category: provider
+template <typename In, typename Out>
+class Base {
+};
+
+class Forward;
+
+// @registry_name: First
+// @registry_aliases: first, one
+template <typename In, typename Out,
+          typename = void>
+class First : public Base<In, Out> {
+};
+
+class Second : public Base<int, int> {
+};
+"""
+
+
+class TestMetadataIndex(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.header = str(pathlib.Path(self._tmp.name) / "header.hpp")
+        pathlib.Path(self.header).write_text(HEADER)
+        generate_registry.clear_header_caches()
+
+    def tearDown(self):
+        generate_registry.clear_header_caches()
+        self._tmp.cleanup()
+
+    def test_tags_attach_to_next_declaration(self):
+        index = generate_registry.build_metadata_index(self.header)
+        self.assertEqual(index[5], {"category": "provider"})
+        self.assertEqual(index[14], {"registry_name": "First", "aliases": ["first", "one"]})
+
+    def test_tags_do_not_leak_to_following_class(self):
+        index = generate_registry.build_metadata_index(self.header)
+        self.assertEqual(index[17], {})
+
+    def test_forward_declaration_is_not_a_target(self):
+        index = generate_registry.build_metadata_index(self.header)
+        self.assertNotIn(8, index)
+
+
+class TestMetadataLine(unittest.TestCase):
+    def _parse(self, line):
+        metadata = {}
+        return generate_registry._parse_metadata_line(line, metadata), metadata
+
+    def test_spacing_after_comment_marker_is_optional(self):
+        self.assertEqual(self._parse("//@category: provider\n"), (True, {"category": "provider"}))
+        self.assertEqual(self._parse("//   @registry_aliases: a ,b\n"), (True, {"aliases": ["a", "b"]}))
+
+    def test_malformed_tags_are_not_tags(self):
+        self.assertEqual(self._parse("// @category : provider\n"), (False, {}))
+        self.assertEqual(self._parse("// @category:\n"), (False, {}))
+        self.assertEqual(self._parse("// @unknown: value\n"), (False, {}))
+        self.assertEqual(self._parse("// plain comment\n"), (False, {}))
+
+
+if __name__ == "__main__":
+    unittest.main()